@@ -1,36 +1,45 @@
+import hashlib
+import os
+import time
 from functools import wraps
 
 import jwt
-from flask import Flask, request, jsonify, g
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from flask import Flask, current_app, request, jsonify, g
 from flask_cors import CORS, cross_origin
 
-from app.db import db
+from app.db import db, init_db_command
 from app.db_config import db_config
 from app import config as cfg
 
 from app.models.usuarios import Usuario
+from app.utils.db_pool import MeteredQueuePool, build_engine_options
+from app.utils.ttl_cache import TTLCache
 from flask_migrate import Migrate
 
 # Agregar los cambios de modelos a db: "flask db migrate"
 # Commitear los cambios de modelos a db: "flask db upgrade"
 # Si falla, eliminar el directorio 'migrations', ejecutar 'flask db init' y luego las dos instrucciones anteriores
 
-def deploy_app() :
+def create_app(config: dict = None) -> Flask:
+    """Crea y configura la app. No se conecta a la base de datos: el esquema lo administran las migraciones
+    ("flask db upgrade" o "flask init-db") y las conexiones se abren recien con la primera request"""
     app = Flask(__name__)
     CORS(app)
     app.config[
         "SQLALCHEMY_DATABASE_URI"] = f"mysql+pymysql://{db_config.get('USER')}:{db_config.get('PASSWORD')}@{db_config.get('HOST')}/{db_config.get('DATABASE')}"
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = build_engine_options()
     app.config["SECRET_KEY"] = cfg.SECRET_KEY
     app.config["REFRESH_SECRET_KEY"] = cfg.REFRESH_SECRET_KEY
     app.config['CORS_HEADERS'] = 'Content-Type'
+    if config:
+        app.config.update(config)
 
     db.init_app(app)
-
-    with app.app_context():
-        db.create_all()
-
-    migrate = Migrate(app, db)
+    # Ruta absoluta, para no depender del directorio desde el que se inicia el proceso
+    migrate = Migrate(app, db, directory=os.path.join(os.path.dirname(app.root_path), 'migrations'))
 
     @app.route("/about")
     @cross_origin()
@@ -43,11 +52,90 @@ def deploy_app() :
     @cross_origin()
     # @login_required
     def health():
+        """Liveness: solo indica que el proceso responde, sin consultar la base ni exponer datos internos"""
+        return jsonify({'health': 'ok'}), 200
+
+
+    @app.route("/health/metrics")
+    @cross_origin()
+    @token_required
+    def health_metrics():
+        """Metricas internas de la cache de tokens y del pool de conexiones, solo para administradores"""
+        if not g.current_user.is_admin:
+            return jsonify({'message': 'No tiene permisos para ver las metricas'}), 403
+        pool = db.engine.pool
         return jsonify({
-            'health': 'ok'
+            'token_cache': {'hits': _tokens.hits, 'misses': _tokens.misses, 'size': len(_tokens)},
+            'db_pool': pool.metrics() if isinstance(pool, MeteredQueuePool) else pool.status()
         }), 200
-    return app;
-app = deploy_app()
+
+
+    @app.route("/ready")
+    @cross_origin()
+    def ready():
+        """Indica si la app puede atender requests: la base responde y su esquema esta en la ultima migracion"""
+        try:
+            expected_heads = set(ScriptDirectory.from_config(migrate.get_config()).get_heads())
+        except Exception:
+            return jsonify({'ready': False, 'schema': 'no se encontraron las migraciones'}), 503
+        try:
+            with db.engine.connect() as connection:
+                current_heads = set(MigrationContext.configure(connection).get_current_heads())
+        except Exception:
+            return jsonify({'ready': False, 'database': 'sin conexion'}), 503
+        if current_heads != expected_heads:
+            return jsonify({
+                'ready': False,
+                'database': 'ok',
+                'schema': 'migraciones pendientes',
+                'current': sorted(current_heads),
+                'expected': sorted(expected_heads)
+            }), 503
+        return jsonify({'ready': True, 'database': 'ok', 'schema': 'ok'}), 200
+
+    from app.controllers import auth, usuarios, ingresos, gastos, feedback, movimientos
+    app.register_blueprint(auth.bp)
+    app.register_blueprint(usuarios.bp)
+    app.register_blueprint(ingresos.bp)
+    app.register_blueprint(gastos.bp)
+    app.register_blueprint(feedback.bp)
+    app.register_blueprint(movimientos.bp)
+
+    from app.services.cotizaciones import sync_cotizaciones_command
+    from app.services.cuentas import resume_account_deletions_command
+    from app.services.resumenes import rebuild_resumenes_command
+    from app.services.saldo import rebuild_saldos_command
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(sync_cotizaciones_command)
+    app.cli.add_command(rebuild_saldos_command)
+    app.cli.add_command(rebuild_resumenes_command)
+    app.cli.add_command(resume_account_deletions_command)
+    return app
+
+
+deploy_app = create_app  # Nombre usado por el comando de inicio del deploy
+
+
+# Cache de access tokens ya verificados: {sha256 del token: payload}, cada entrada vence junto con el token
+_tokens = TTLCache(cfg.TOKEN_CACHE_MAX_SIZE, 0)
+
+
+def decode_access_token(token: str) -> dict:
+    """Devuelve el payload del access token, verificandolo con jwt.decode solo la primera vez que se presenta.
+    Lanza las mismas excepciones que jwt.decode"""
+    key = hashlib.sha256(token.encode()).hexdigest()
+    data = _tokens.get(key)
+    if data is not None:
+        if data['exp'] > time.time():
+            return data
+        _tokens.invalidate(key)
+        raise jwt.ExpiredSignatureError('Signature has expired')
+
+    data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=["HS256"])
+    if 'exp' in data:  # Los tokens sin vencimiento no se cachean
+        _tokens.set(key, data, ttl=data['exp'] - time.time())
+    return data
+
 
 def token_required(f):
         @wraps(f)
@@ -62,24 +150,20 @@ def token_required(f):
 
             try:
                 # decoding the payload to fetch the stored details
-                data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
+                data = decode_access_token(token)
                 g.user_id = data['id']
             except jwt.ExpiredSignatureError:
                 return jsonify({'message': 'El token ha expirado'}), 401
             except jwt.InvalidTokenError:
                 return jsonify({'message': 'El token es invalido'}), 401
+            # Se carga una sola vez por request (y desde la cache si esta vigente) el usuario logueado
+            g.current_user = Usuario.get_autenticado(g.user_id)
+            if g.current_user is None:
+                return jsonify({'message': 'El token es invalido'}), 401
             # returns the current logged in users context to the routes
             return f(*args, **kwargs)
 
         return decorated
 
-from app.controllers import auth, usuarios, ingresos, gastos, feedback
-app.register_blueprint(auth.bp)
-app.register_blueprint(usuarios.bp)
-app.register_blueprint(ingresos.bp)
-app.register_blueprint(gastos.bp)
-app.register_blueprint(feedback.bp)
-
-
 if __name__ == '__main__':
-    app.run(debug=True)
+    create_app().run(debug=True)
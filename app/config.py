@@ -1,6 +1,51 @@
 # Archivo de configuración global del backend
+import os
 
 EMAIL_VERIFICATION = False  # SMTP Server aun no implementado
 
 SECRET_KEY = "super-secret"  # CAMBIAR A ALGO SEGURO EN PRODUCCION!!!
 REFRESH_SECRET_KEY = "super-refresh"  # CAMBIAR A ALGO SEGURO EN PRODUCCION!!!
+
+# Cotizaciones de moneda extranjera (dolarapi.com)
+EXCHANGE_RATE_TTL = 300  # Segundos durante los cuales una cotizacion se considera vigente
+EXCHANGE_RATE_MAX_STALE = 3600  # Segundos extra en los que se sirve la ultima cotizacion mientras se refresca en segundo plano
+EXCHANGE_RATE_TIMEOUT = 3  # Segundos maximos de espera a la API de cotizaciones
+EXCHANGE_RATE_HISTORY_TIMEOUT = 30  # Segundos maximos de espera al descargar el historico de cotizaciones
+
+# Cargas masivas de ingresos y gastos
+BULK_MAX_ITEMS = 500  # Cantidad maxima de elementos por request en /bulk_add
+IMPORT_CHUNK_SIZE = 500  # Filas de un extracto bancario que se deduplican e insertan por transaccion
+IMPORT_MAX_ERRORS = 100  # Cantidad maxima de filas con error detalladas en la respuesta de /import
+EXPORT_YIELD_PER = 1000  # Filas que se leen por vez de la base al exportar el historial completo
+SERIES_MAX_BUCKETS = 1000  # Cantidad maxima de periodos que devuelve /series (los periodos vacios tambien cuentan)
+
+# Eliminacion de cuentas
+ACCOUNT_DELETE_CHUNK_SIZE = 1000  # Filas eliminadas por transaccion en el borrado en segundo plano de una cuenta
+
+# Cache de usuarios autenticados (por proceso)
+# La invalidacion al modificar o eliminar un usuario solo alcanza al proceso que hizo el cambio: en los demas
+# workers un usuario eliminado o sin permisos de admin puede seguir autenticandose hasta USER_CACHE_TTL segundos
+USER_CACHE_TTL = 10  # Segundos durante los cuales se reutilizan los permisos de un usuario sin consultar la base
+USER_CACHE_MAX_SIZE = 1024  # Cantidad maxima de usuarios en la cache
+TOKEN_CACHE_MAX_SIZE = 4096  # Cantidad maxima de access tokens verificados que se recuerdan hasta su vencimiento
+
+# Registro diferido del ultimo login
+LAST_LOGIN_FLUSH_INTERVAL = 30  # Segundos entre cada escritura por lotes de los ultimos logins
+
+# Hashing de passwords
+# Metodo y costo en formato de werkzeug (ej. "scrypt:32768:8:1" o "pbkdf2:sha256:600000").
+# Los hashes generados con otro metodo o costo se regeneran al loguearse el usuario
+PASSWORD_HASH_METHOD = "scrypt:32768:8:1"
+PASSWORD_SALT_LENGTH = 16
+PASSWORD_HASH_WORKERS = 2  # Hilos que calculan hashes en paralelo por proceso
+PASSWORD_HASH_QUEUE_SIZE = 8  # Hashes que pueden esperar un hilo libre antes de responder 503
+PASSWORD_HASH_TIMEOUT = 10  # Segundos maximos de espera por un hash antes de responder 503
+
+# Pool de conexiones a la base de datos (configurable por variables de entorno)
+# Cada worker de gunicorn tiene su propio pool y atiende hasta --threads requests a la vez (worker gthread, ver
+# railway.json): DB_POOL_SIZE debe coincidir con --threads para que cada hilo tenga su conexion sin abrir overflow
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 8))  # Conexiones que se mantienen abiertas
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))  # Conexiones extra que se abren en picos y se cierran al liberarse
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))  # Segundos maximos de espera por una conexion libre
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 280))  # Segundos tras los cuales se renueva una conexion (antes de que el proxy la corte)
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').casefold() == 'true'  # Verifica la conexion antes de usarla
@@ -1,14 +1,12 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 import jwt
 import datetime
 
 from flask_cors import cross_origin
 
-from app import app
-
-from werkzeug.security import check_password_hash, generate_password_hash
-
 from app.models.usuarios import Usuario
+from app.services.last_login import last_login_buffer
+from app.services.passwords import PasswordHasherBusy, password_hasher
 from app.utils.email_validation import validar_email
 
 from app import config as cfg
@@ -19,7 +17,7 @@ def generate_access_token(user_id):
         'id': user_id,
         'exp': datetime.datetime.utcnow() + datetime.timedelta(minutes=15)  # utcnow() DEPRECATED, solucion abajo funciona en windows, no en linux
         # 'exp': datetime.datetime.now(datetime.UTC) + datetime.timedelta(minutes=15)
-    }, app.config['SECRET_KEY'], algorithm="HS256")
+    }, current_app.config['SECRET_KEY'], algorithm="HS256")
 
 
 def generate_refresh_token(user_id):
@@ -27,7 +25,7 @@ def generate_refresh_token(user_id):
         'id': user_id,
         'exp': datetime.datetime.utcnow() + datetime.timedelta(days=7)  # utcnow() DEPRECATED, solucion abajo funciona en windows, no en linux
         # 'exp': datetime.datetime.now(datetime.UTC) + datetime.timedelta(days=7)
-    }, app.config['REFRESH_SECRET_KEY'], algorithm="HS256")
+    }, current_app.config['REFRESH_SECRET_KEY'], algorithm="HS256")
 
 
 bp = Blueprint('auth', __name__, url_prefix='/auth')
@@ -48,7 +46,7 @@ def user_login():
     username = auth.get('username')
     password = auth.get('password')
 
-    usuario: Usuario = Usuario.query.filter_by(username=username).first()
+    usuario: Usuario = Usuario.query.filter_by(username=username, deleted_on=None).first()
 
     if not usuario:
         # returns 401 if user does not exist
@@ -61,13 +59,22 @@ def user_login():
             'message': 'Usuario no validado'
         }), 403
 
-    if check_password_hash(usuario.password_hash, password):
+    try:
+        password_valido = password_hasher.verify(usuario.password_hash, password)
+        if password_valido and password_hasher.needs_rehash(usuario.password_hash):
+            # El hash se genero con parametros anteriores, se regenera con los configurados
+            usuario.password_hash = password_hasher.hash(password)
+            usuario.update()
+    except PasswordHasherBusy as e:
+        return jsonify({'message': str(e)}), 503, {'Retry-After': '1'}
+
+    if password_valido:
         # generates the JWT Token
         access_token = generate_access_token(usuario.get_id())
         refresh_token = generate_refresh_token(usuario.get_id())
 
-        usuario.last_login = datetime.datetime.now()
-        usuario.update()
+        # El ultimo login se escribe en segundo plano, sin demorar la respuesta
+        last_login_buffer.record(usuario.id, datetime.datetime.now())
 
         return jsonify({'access_token': access_token, 'refresh_token': refresh_token})
 
@@ -102,7 +109,11 @@ def user_signup():
     if not usuario:
         # database ORM object
         verified_on_creation = not cfg.EMAIL_VERIFICATION  # Si no se verifica email, se asume verificacion correcta
-        usuario = Usuario(username = username, password_hash = generate_password_hash(password), email = email, is_verified = verified_on_creation)
+        try:
+            password_hash = password_hasher.hash(password)
+        except PasswordHasherBusy as e:
+            return jsonify({'message': str(e)}), 503, {'Retry-After': '1'}
+        usuario = Usuario(username = username, password_hash = password_hash, email = email, is_verified = verified_on_creation)
 
         # ---------- INICIO DE VALIDACIONES ---------------------
 
@@ -144,7 +155,7 @@ def refresh():
         return jsonify({'message': 'Token is missing!'}), 401
 
     try:
-        data = jwt.decode(token, app.config['REFRESH_SECRET_KEY'], algorithms=["HS256"])
+        data = jwt.decode(token, current_app.config['REFRESH_SECRET_KEY'], algorithms=["HS256"])
         new_access_token = generate_access_token(data['id'])
     except jwt.ExpiredSignatureError:
         return jsonify({'message': 'Refresh token has expired!'}), 401
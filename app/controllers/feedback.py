@@ -4,7 +4,6 @@ from app import token_required
 from flask import Blueprint, jsonify, request, g
 
 from app.models.feedback import Feedback
-from app.models.usuarios import Usuario
 
 from app.utils.paginated_query import paginated_query
 
@@ -26,8 +25,7 @@ def get_tipos_distinct():
 def get_all():
     """Devuelve un JSON con info de todas las entradas de feedback generados por un usuario"""
 
-    current_user: Usuario = Usuario.query.filter_by(id=g.user_id).first()
-    if current_user.is_admin:  # Si es admin, traigo el listado del feedback de todos los usuarios
+    if g.current_user.is_admin:  # Si es admin, traigo el listado del feedback de todos los usuarios
         feedbacks = Feedback.query.all()
     else:  # Si NO es admin, rechazo el listado
         feedbacks = Feedback.query.filter_by(id_usuario=g.user_id).all()
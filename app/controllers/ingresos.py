@@ -5,7 +5,7 @@ from flask import Blueprint, request, jsonify
 
 from app.models.ingresos import Ingreso
 
-from app.services import elemento_financiero as ef
+from app.services import elemento_financiero as ef, exportacion, importacion
 
 bp = Blueprint('ingresos', __name__, url_prefix='/ingresos')
 
@@ -29,6 +29,18 @@ def get_all():
     return jsonify(message), status_code
 
 
+@bp.route('/export', methods=['GET'])
+@cross_origin()
+@token_required
+def export():
+    """Descarga en CSV o NDJSON todos los ingresos de un usuario en base a diferentes filtros"""
+
+    message, status_code = exportacion.export(request.args, Ingreso, "ingresos")
+    if isinstance(message, dict):
+        return jsonify(message), status_code
+    return message, status_code
+
+
 @bp.route('/get', methods=['GET'])
 @cross_origin()
 @token_required
@@ -69,6 +81,26 @@ def count():
     return jsonify(message), status_code
 
 
+@bp.route('/series', methods=['GET'])
+@cross_origin()
+@token_required
+def series():
+    """Devuelve un JSON con el total, cantidad y promedio por dia/semana/mes/anio entre fechas de los ingresos de un usuario"""
+
+    message, status_code = ef.series(request.args, Ingreso)
+    return jsonify(message), status_code
+
+
+@bp.route('/por_tipo', methods=['GET'])
+@cross_origin()
+@token_required
+def por_tipo():
+    """Devuelve un JSON con el total, cantidad, promedio y porcentaje por tipo de los ingresos de un usuario"""
+
+    message, status_code = ef.breakdown(request.args, Ingreso)
+    return jsonify(message), status_code
+
+
 @bp.route('/add', methods=['POST'])
 @cross_origin()
 @token_required
@@ -79,6 +111,26 @@ def add():
     return jsonify(message), status_code
 
 
+@bp.route('/bulk_add', methods=['POST'])
+@cross_origin()
+@token_required
+def bulk_add():
+    """Agrega varios ingresos al usuario logueado en una sola transaccion"""
+
+    message, status_code = ef.bulk_add(request.json, Ingreso)
+    return jsonify(message), status_code
+
+
+@bp.route('/import', methods=['POST'])
+@cross_origin()
+@token_required
+def import_file():
+    """Importa los ingresos de un extracto bancario (CSV u OFX) enviado en el campo 'file' al usuario logueado"""
+
+    message, status_code = importacion.import_file(request.files.get('file'), request.args, Ingreso)
+    return jsonify(message), status_code
+
+
 @bp.route('/update', methods=['PUT'])
 @cross_origin()
 @token_required
@@ -97,3 +149,23 @@ def delete():
 
     message, status_code = ef.delete(request.args, Ingreso)
     return jsonify(message), status_code
+
+
+@bp.route('/bulk_update_tipo', methods=['PUT'])
+@cross_origin()
+@token_required
+def bulk_update_tipo():
+    """Cambia el tipo de varios ingresos del usuario logueado, indicados por 'ids' o por 'filters'"""
+
+    message, status_code = ef.bulk_update_tipo(request.json, Ingreso, "ingresos")
+    return jsonify(message), status_code
+
+
+@bp.route('/bulk_delete', methods=['DELETE'])
+@cross_origin()
+@token_required
+def bulk_delete():
+    """Elimina varios ingresos del usuario logueado, indicados por 'ids' o por 'filters'"""
+
+    message, status_code = ef.bulk_delete(request.json, Ingreso, "ingresos")
+    return jsonify(message), status_code
@@ -0,0 +1,18 @@
+from flask_cors import cross_origin
+
+from app import token_required
+from flask import Blueprint, request, jsonify
+
+from app.services.movimientos import get_movimientos
+
+bp = Blueprint('movimientos', __name__, url_prefix='/movimientos')
+
+
+@bp.route('/get_all', methods=['GET'])
+@cross_origin()
+@token_required
+def get_all():
+    """Devuelve un JSON con los ingresos y gastos de un usuario intercalados por fecha, paginados por cursor"""
+
+    message, status_code = get_movimientos(request.args)
+    return jsonify(message), status_code
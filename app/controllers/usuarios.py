@@ -1,12 +1,14 @@
+import jwt
 from flask_cors import cross_origin
-from werkzeug.security import generate_password_hash
 
-from app import token_required
-from flask import Blueprint, jsonify, request, g
+from app import decode_access_token, token_required
+from flask import Blueprint, jsonify, request, g, url_for
 
-from app.models.gastos import Gasto
-from app.models.ingresos import Ingreso
 from app.models.usuarios import Usuario
+from app.services.cuentas import delete_account, delete_account_async, get_deletion_status
+from app.services.dashboard import get_dashboard
+from app.services.passwords import PasswordHasherBusy, password_hasher
+from app.services.saldo import get_saldo
 from app.utils.email_validation import validar_email
 
 from app import config as cfg
@@ -20,23 +22,21 @@ bp = Blueprint('usuarios', __name__, url_prefix='/usuarios')
 @cross_origin()
 @token_required
 def saldo():
+    """Devuelve el saldo (ingresos - gastos) del usuario logueado, opcionalmente entre fechas y en otra moneda"""
 
     # Obtengo el id de usuario del token
-    id_usuario = g.user_id
+    message, status_code = get_saldo(request.args, g.user_id)
+    return jsonify(message), status_code
 
-    current_saldo = 0.0
 
-    ingresos = Ingreso.query.filter_by(id_usuario=id_usuario).all()
-    for ingreso in ingresos:
-        current_saldo += ingreso.monto
-
-    gastos = Gasto.query.filter_by(id_usuario=id_usuario).all()
-    for gasto in gastos:
-        current_saldo -= gasto.monto
+@bp.route('/dashboard', methods=['GET'])
+@cross_origin()
+@token_required
+def dashboard():
+    """Devuelve en un unico JSON el saldo, totales, cantidades, promedio de gastos y tipos del usuario logueado"""
 
-    return jsonify({
-        'saldo': format(current_saldo, ".2f"),
-    }), 200
+    message, status_code = get_dashboard(request.args, g.user_id)
+    return jsonify(message), status_code
 
 
 @bp.route('/list', methods=['GET'])
@@ -44,9 +44,8 @@ def saldo():
 @token_required
 def get_all_users():
     """Devuelve un JSON con info de todos los usuarios"""
-    current_user: Usuario = Usuario.query.filter_by(id=g.user_id).first()
-    if current_user.is_admin:  # Si es admin, traigo el listado de todos los usuarios
-        usuarios = Usuario.query.all()
+    if g.current_user.is_admin:  # Si es admin, traigo el listado de todos los usuarios
+        usuarios = Usuario.query.filter_by(deleted_on=None).all()
     else:  # Si NO es admin, rechazo el listado
         return jsonify({
             'message': 'No tiene permisos para esta operación'
@@ -136,8 +135,13 @@ def update():
 
     # ---------- FIN DE VALIDACIONES ---------------------
 
+    try:
+        password_hash = password_hasher.hash(password)
+    except PasswordHasherBusy as e:
+        return jsonify({'message': str(e)}), 503, {'Retry-After': '1'}
+
     usuario.username = username
-    usuario.password = generate_password_hash(password)
+    usuario.password_hash = password_hash
 
     if cfg.EMAIL_VERIFICATION and usuario.email != email:
         usuario.email = email
@@ -162,19 +166,35 @@ def update():
 @cross_origin()
 @token_required
 def delete():
+    """Elimina el usuario logueado junto con todos sus ingresos, gastos y feedback.
+    Con 'async=true' el borrado se hace en segundo plano y por partes, y se responde inmediatamente"""
 
-    id_usuario = g.user_id
-    current_user: Usuario = Usuario.query.filter_by(id=g.user_id).first()
-
-    ingresos = Ingreso.query.filter_by(id_usuario=id_usuario).all()
-    for ingreso in ingresos:
-        ingreso.delete()
-
-    gastos = Gasto.query.filter_by(id_usuario=id_usuario).all()
-    for gasto in gastos:
-        gasto.delete()
+    if request.args.get('async', default='false', type=str).casefold() == 'true':
+        delete_account_async(g.user_id)
+        return jsonify({
+            'message': 'La eliminacion del usuario se esta procesando',
+            'estado': 'en_proceso'
+        }), 202, {'Location': url_for('usuarios.delete_status')}
 
-    current_user.delete()
+    delete_account(g.user_id)
     return jsonify({
         'message': 'Usuario eliminado exitosamente'
     }), 200
+
+
+@bp.route('/delete_status', methods=['GET'])
+@cross_origin()
+def delete_status():
+    """Indica si termino la eliminacion del usuario iniciada con 'async=true' ('activa', 'en_proceso' o 'eliminada').
+    Acepta el access token del usuario aunque la cuenta ya no pueda operar"""
+    token = request.headers.get('x-access-token')
+    if not token:
+        return jsonify({'message': 'Falta el token'}), 401
+    try:
+        data = decode_access_token(token)
+    except jwt.ExpiredSignatureError:
+        return jsonify({'message': 'El token ha expirado'}), 401
+    except jwt.InvalidTokenError:
+        return jsonify({'message': 'El token es invalido'}), 401
+
+    return jsonify({'estado': get_deletion_status(int(data['id']))}), 200
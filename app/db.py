@@ -1,35 +1,33 @@
-import mysql.connector
 import click
-from app.db_config import db_config
-from flask import g
 from flask.cli import with_appcontext
-# from .schema import instructions
+from flask_migrate import upgrade
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
+from sqlalchemy.orm import DeclarativeBase
+
 
+class Base(DeclarativeBase):
+    pass
 
-def get_db():
-    if 'db' not in g:
-        g.db = mysql.connector.connect(
-            host=db_config.get("HOST"),
-            user=db_config.get("USER"),
-            password=db_config.get("PASSWORD"),
-            database=db_config.get("DATABASE"),
-        )
-        g.c = g.db.cursor(dictionary=True)
-    return g.db, g.c
 
+# Unico punto de acceso a la base: todas las conexiones salen del pool del engine de Flask-SQLAlchemy
+db = SQLAlchemy(model_class=Base)
 
-def close_db():
-    db = g.pop('db', None)
 
-    if db is not None:
-        db.close()
+def execute_sql(sql: str, params: dict = None, commit: bool = False):
+    """Ejecuta SQL crudo (con parametros ':nombre') en la sesion actual, usando el mismo pool de conexiones.
+    Devuelve las filas como diccionarios si la sentencia devuelve filas, o la cantidad de filas afectadas"""
+    result = db.session.execute(text(sql), params or {})
+    output = result.mappings().all() if result.returns_rows else result.rowcount
+    if commit:
+        db.session.commit()
+    return output
 
 
 def init_db():
-    db, c = get_db()
-    """for i in instructions:
-        c.execute(i)"""
-    db.commit()
+    """Crea o actualiza el esquema aplicando las migraciones pendientes (igual que "flask db upgrade"),
+    asi la base queda registrada en la ultima revision"""
+    upgrade()
 
 
 @click.command('init-db')  # to create the database's tables the command is: flask init-db
@@ -37,21 +35,3 @@ def init_db():
 def init_db_command():
     init_db()
     click.echo('Database initialized')
-
-
-def init_app(app):
-    app.teardown_appcontext(close_db)
-    app.cli.add_command(init_db_command)
-
-################################################
-
-
-from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.orm import DeclarativeBase
-
-
-class Base(DeclarativeBase):
-    pass
-
-
-db = SQLAlchemy(model_class=Base)
@@ -0,0 +1,30 @@
+from datetime import date
+from typing import Optional
+
+import sqlalchemy as sa
+import sqlalchemy.orm as so
+from app.db import db
+
+
+class Cotizacion(db.Model):
+    __tablename__ = 'exchange_rates'
+    __table_args__ = (
+        sa.UniqueConstraint('currency', 'currency_type', 'fecha', name='uq_exchange_rates_currency_type_fecha'),
+    )
+
+    id: so.Mapped[int] = so.mapped_column(sa.Integer, primary_key=True)
+    fecha: so.Mapped[date] = so.mapped_column(sa.Date)
+    currency: so.Mapped[str] = so.mapped_column(sa.String(8))
+    currency_type: so.Mapped[str] = so.mapped_column(sa.String(32))
+    compra: so.Mapped[Optional[float]] = so.mapped_column(sa.Float)
+    venta: so.Mapped[float] = so.mapped_column(sa.Float)
+
+    def __repr__(self):
+        return f'Cotizacion ({self.fecha}, {self.currency}, {self.currency_type}, {self.venta})'
+
+    def __init__(self, fecha, currency, currency_type, compra, venta):
+        self.fecha = fecha
+        self.currency = currency
+        self.currency_type = currency_type
+        self.compra = compra
+        self.venta = venta
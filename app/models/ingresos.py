@@ -3,21 +3,28 @@ from datetime import datetime
 import sqlalchemy as sa
 import sqlalchemy.orm as so
 from app.db import db
+from app.models.resumenes import Resumen
+from app.models.saldos import Saldo
 
 
 class Ingreso(db.Model):
     __tablename__ = 'ingresos'
+    __table_args__ = (  # Todas las consultas filtran primero por usuario y luego por rango/orden
+        sa.Index('ix_ingresos_id_usuario_fecha_id', 'id_usuario', 'fecha', 'id'),
+        sa.Index('ix_ingresos_id_usuario_monto', 'id_usuario', 'monto'),
+        sa.Index('ix_ingresos_id_usuario_tipo', 'id_usuario', 'tipo'),
+    )
     _descripcion_char_limit = 256
     _tipo_char_limit = 32
 
     id: so.Mapped[int] = so.mapped_column(sa.Integer, primary_key=True)
     descripcion: so.Mapped[str] = so.mapped_column(sa.String(_descripcion_char_limit))
-    fecha: so.Mapped[datetime] = so.mapped_column(index=True, server_default=db.func.now())
+    fecha: so.Mapped[datetime] = so.mapped_column(index=True, server_default=db.func.now(), active_history=True)
     created_on: so.Mapped[datetime] = so.mapped_column(index=True, server_default=db.func.now())
     last_updated_on: so.Mapped[datetime] = so.mapped_column(index=True, server_default=db.func.now(),
                                                             server_onupdate=db.func.now())
-    monto: so.Mapped[float] = so.mapped_column(sa.Float)
-    tipo: so.Mapped[str] = so.mapped_column(sa.String(_tipo_char_limit))
+    monto: so.Mapped[float] = so.mapped_column(sa.Float, active_history=True)  # El saldo necesita el monto anterior al modificarlo
+    tipo: so.Mapped[str] = so.mapped_column(sa.String(_tipo_char_limit), active_history=True)  # Los resumenes necesitan el tipo y fecha anteriores
     id_usuario: so.Mapped[int] = so.mapped_column(sa.ForeignKey("usuarios.id"))
 
     def __repr__(self):
@@ -47,13 +54,50 @@ class Ingreso(db.Model):
     def create(cls, ingreso):
         """Crea un ingreso en la base de datos"""
         db.session.add(ingreso)
+        Saldo.registrar_alta(ingreso)
+        Resumen.registrar_alta(ingreso)
         db.session.commit()
 
+    @classmethod
+    def bulk_create(cls, id_usuario: int, elementos: list):
+        """Crea varios ingresos del usuario en la base de datos con una sola sentencia y transaccion"""
+        ahora = db.session.execute(sa.select(db.func.now())).scalar()  # Misma fecha por defecto que un alta individual
+        values = [{'id_usuario': id_usuario, 'descripcion': elemento['descripcion'], 'monto': elemento['monto'],
+                   'tipo': elemento['tipo'], 'fecha': elemento.get('fecha') or ahora} for elemento in elementos]
+        db.session.execute(sa.insert(cls), values)
+        Saldo.registrar(cls.__tablename__, id_usuario, sum(float(value['monto']) for value in values))
+        Resumen.registrar_altas(cls, values)
+        db.session.commit()
+
+    @classmethod
+    def bulk_update_tipo(cls, filters: list, tipo: str) -> int:
+        """Cambia el tipo de todos los ingresos que cumplen los filtros con una sola sentencia. Devuelve la cantidad modificada"""
+        claves, _ = Resumen.afectados(cls, filters, tipo)
+        result = db.session.execute(sa.update(cls).where(*filters).values(tipo=tipo), execution_options={'synchronize_session': False})
+        Resumen.recalcular(cls, claves)
+        db.session.commit()
+        return result.rowcount
+
+    @classmethod
+    def bulk_delete(cls, filters: list) -> int:
+        """Elimina todos los ingresos que cumplen los filtros con una sola sentencia. Devuelve la cantidad eliminada"""
+        claves, totales = Resumen.afectados(cls, filters)
+        result = db.session.execute(sa.delete(cls).where(*filters), execution_options={'synchronize_session': False})
+        for id_usuario, total in totales.items():
+            Saldo.registrar(cls.__tablename__, id_usuario, -total)
+        Resumen.recalcular(cls, claves)
+        db.session.commit()
+        return result.rowcount
+
     def update(self):
         """Actualiza un ingreso en la base de datos"""
+        Saldo.registrar_cambio(self)
+        Resumen.registrar_cambio(self)
         db.session.commit()
 
     def delete(self):
         """Elimina un ingreso de la base de datos"""
+        Saldo.registrar_baja(self)
         db.session.delete(self)
+        Resumen.registrar_baja(self)
         db.session.commit()
@@ -0,0 +1,126 @@
+import datetime
+
+import sqlalchemy as sa
+import sqlalchemy.orm as so
+from app.db import db
+from app.utils.date_buckets import as_datetime, bucket_start, next_bucket
+
+
+class Resumen(db.Model):
+    """Totales precalculados por usuario, tipo y periodo (semana o mes) de los ingresos y gastos.
+    Se recalculan en la misma transaccion que cada alta, modificacion o baja de un ingreso/gasto"""
+    __tablename__ = 'resumenes'
+    granularidades = ('semana', 'mes')
+
+    id_usuario: so.Mapped[int] = so.mapped_column(sa.ForeignKey("usuarios.id"), primary_key=True)
+    tabla: so.Mapped[str] = so.mapped_column(sa.String(16), primary_key=True)  # 'ingresos' o 'gastos'
+    granularidad: so.Mapped[str] = so.mapped_column(sa.String(8), primary_key=True)
+    periodo: so.Mapped[datetime.date] = so.mapped_column(sa.Date, primary_key=True)  # Primer dia del periodo
+    tipo: so.Mapped[str] = so.mapped_column(sa.String(32), primary_key=True)
+    total: so.Mapped[float] = so.mapped_column(sa.Double)  # DOUBLE: un FLOAT de MySQL redondea los totales mayores a 2^24
+    cantidad: so.Mapped[int] = so.mapped_column(sa.Integer)
+    minimo: so.Mapped[float] = so.mapped_column(sa.Double)
+    maximo: so.Mapped[float] = so.mapped_column(sa.Double)
+
+    def __repr__(self):
+        return f'Resumen ({self.id_usuario}, {self.tabla}, {self.granularidad}, {self.periodo}, {self.tipo}, {self.total})'
+
+    @classmethod
+    def claves(cls, id_usuario: int, tipo: str, fecha) -> set:
+        """Devuelve las claves (id_usuario, tipo, granularidad, periodo) de los periodos que contienen a la fecha"""
+        return {(id_usuario, tipo, granularidad, bucket_start(as_datetime(fecha), granularidad))
+                for granularidad in cls.granularidades}
+
+    @classmethod
+    def totales_periodo(cls, model_object, id_usuario: int, tipo: str, granularidad: str, periodo: datetime.date):
+        """Devuelve la query de (suma, cantidad, minimo, maximo) de los elementos de un periodo.
+        Es una lectura con bloqueo (FOR UPDATE): con REPEATABLE READ una lectura comun usa la foto tomada al inicio de
+        la transaccion y omitiria los elementos que otra transaccion commiteo despues en el mismo periodo"""
+        return sa.select(
+            sa.func.sum(model_object.monto),
+            sa.func.count(model_object.id),
+            sa.func.min(model_object.monto),
+            sa.func.max(model_object.monto)
+        ).where(
+            model_object.id_usuario == id_usuario,
+            model_object.tipo == tipo,
+            model_object.fecha >= as_datetime(periodo),
+            model_object.fecha < as_datetime(next_bucket(periodo, granularidad))
+        ).with_for_update()
+
+    @classmethod
+    def recalcular(cls, model_object, claves: set):
+        """Recalcula desde la tabla base los resumenes de las claves dadas, dentro de la transaccion en curso (no commitea)"""
+        for id_usuario, tipo, granularidad, periodo in claves:
+            db.session.execute(sa.delete(cls).where(
+                cls.id_usuario == id_usuario,
+                cls.tabla == model_object.__tablename__,
+                cls.granularidad == granularidad,
+                cls.periodo == periodo,
+                cls.tipo == tipo
+            ))
+            total, cantidad, minimo, maximo = db.session.execute(
+                cls.totales_periodo(model_object, id_usuario, tipo, granularidad, periodo)
+            ).one()
+            if cantidad:
+                db.session.execute(sa.insert(cls).values(
+                    id_usuario=id_usuario, tabla=model_object.__tablename__, granularidad=granularidad,
+                    periodo=periodo, tipo=tipo, total=total, cantidad=cantidad, minimo=minimo, maximo=maximo
+                ))
+
+    @classmethod
+    def afectados(cls, model_object, filters: list, tipo: str = None) -> (set, dict):
+        """Bloquea los elementos que cumplen los filtros (antes de modificarlos o eliminarlos en masa) y devuelve
+        las claves de sus resumenes (tambien las del nuevo 'tipo' si se indica) y el total de montos por usuario"""
+        dia = sa.func.date(model_object.fecha)
+        rows = db.session.execute(
+            sa.select(model_object.id_usuario, model_object.tipo, dia.label('dia'), sa.func.sum(model_object.monto).label('total'))
+            .where(*filters)
+            .group_by(model_object.id_usuario, model_object.tipo, dia)
+            .with_for_update()
+        ).all()
+        claves = set()
+        totales = {}
+        for row in rows:
+            claves |= cls.claves(row.id_usuario, row.tipo, row.dia)
+            if tipo is not None:
+                claves |= cls.claves(row.id_usuario, tipo, row.dia)
+            totales[row.id_usuario] = totales.get(row.id_usuario, 0.0) + float(row.total)
+        return claves, totales
+
+    @classmethod
+    def registrar_alta(cls, elemento):
+        """Actualiza los resumenes de los periodos de un elemento nuevo"""
+        db.session.flush()  # La fecha por defecto la completa la base de datos
+        cls.recalcular(type(elemento), cls.claves(elemento.id_usuario, elemento.tipo, elemento.fecha))
+
+    @classmethod
+    def registrar_altas(cls, model_object, values: list):
+        """Actualiza una sola vez los resumenes de todos los periodos afectados por una carga masiva"""
+        claves = set()
+        for value in values:
+            claves |= cls.claves(value['id_usuario'], value['tipo'], value['fecha'])
+        cls.recalcular(model_object, claves)
+
+    @classmethod
+    def registrar_cambio(cls, elemento):
+        """Actualiza los resumenes de los periodos anterior y nuevo de un elemento modificado y todavia no commiteado"""
+        state = sa.inspect(elemento)
+        if not any(state.attrs[attr].history.has_changes() for attr in ('monto', 'tipo', 'fecha')):
+            return
+        tipo_history = state.attrs.tipo.history
+        fecha_history = state.attrs.fecha.history
+        tipo_anterior = tipo_history.deleted[0] if tipo_history.deleted else elemento.tipo
+        fecha_anterior = fecha_history.deleted[0] if fecha_history.deleted else elemento.fecha
+
+        claves = cls.claves(elemento.id_usuario, tipo_anterior, fecha_anterior)
+        claves |= cls.claves(elemento.id_usuario, elemento.tipo, elemento.fecha)
+        db.session.flush()
+        cls.recalcular(type(elemento), claves)
+
+    @classmethod
+    def registrar_baja(cls, elemento):
+        """Actualiza los resumenes de los periodos de un elemento marcado para eliminar y todavia no commiteado"""
+        claves = cls.claves(elemento.id_usuario, elemento.tipo, elemento.fecha)
+        db.session.flush()
+        cls.recalcular(type(elemento), claves)
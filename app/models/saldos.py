@@ -0,0 +1,74 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+import sqlalchemy.orm as so
+from sqlalchemy.dialects import mysql, sqlite
+from app.db import db
+
+
+class Saldo(db.Model):
+    """Totales acumulados de ingresos y gastos por usuario, mantenidos en la misma transaccion que cada alta,
+    modificacion o baja de un ingreso/gasto"""
+    __tablename__ = 'saldos'
+
+    id_usuario: so.Mapped[int] = so.mapped_column(sa.ForeignKey("usuarios.id"), primary_key=True)
+    total_ingresos: so.Mapped[float] = so.mapped_column(sa.Double, default=0.0)  # DOUBLE: un FLOAT de MySQL pierde los pesos por encima de 2^24
+    total_gastos: so.Mapped[float] = so.mapped_column(sa.Double, default=0.0)
+    last_updated_on: so.Mapped[datetime] = so.mapped_column(server_default=db.func.now(), server_onupdate=db.func.now())
+
+    def __repr__(self):
+        return f'Saldo ({self.id_usuario}, {self.saldo})'
+
+    @property
+    def saldo(self):
+        return self.total_ingresos - self.total_gastos
+
+    @classmethod
+    def registrar(cls, tablename: str, id_usuario: int, delta: float):
+        """Suma 'delta' al total de ingresos o gastos del usuario dentro de la transaccion en curso (no commitea).
+        Es un unico upsert atomico, asi dos primeros movimientos concurrentes del usuario no chocan al crear la fila"""
+        column = 'total_ingresos' if tablename == 'ingresos' else 'total_gastos'
+        values = {'id_usuario': id_usuario, 'total_ingresos': 0.0, 'total_gastos': 0.0}
+        values[column] = delta
+        incremento = {column: getattr(cls, column) + delta}
+
+        dialect = db.session.get_bind().dialect.name
+        if dialect == 'mysql':
+            statement = mysql.insert(cls).values(values).on_duplicate_key_update(incremento)
+        elif dialect == 'sqlite':
+            statement = sqlite.insert(cls).values(values).on_conflict_do_update(index_elements=['id_usuario'], set_=incremento)
+        else:
+            statement = None
+
+        # Sin autoflush, para no perder el historial de cambios pendientes que usan los resumenes
+        with db.session.no_autoflush:
+            if statement is not None:
+                db.session.execute(statement)
+                return
+            if db.session.execute(sa.update(cls).where(cls.id_usuario == id_usuario).values(incremento)).rowcount:
+                return
+            try:
+                with db.session.begin_nested():  # Primer movimiento del usuario
+                    db.session.execute(sa.insert(cls).values(values))
+            except sa.exc.IntegrityError:  # Otra transaccion creo la fila mientras tanto
+                db.session.execute(sa.update(cls).where(cls.id_usuario == id_usuario).values(incremento))
+
+    @classmethod
+    def registrar_alta(cls, elemento):
+        """Registra en el saldo un elemento nuevo"""
+        cls.registrar(elemento.__tablename__, elemento.id_usuario, float(elemento.monto))
+
+    @classmethod
+    def registrar_cambio(cls, elemento):
+        """Registra en el saldo la diferencia de monto de un elemento modificado y todavia no commiteado"""
+        history = sa.inspect(elemento).attrs.monto.history
+        if not history.added or not history.deleted:
+            return
+        delta = float(history.added[0]) - float(history.deleted[0])
+        if delta:
+            cls.registrar(elemento.__tablename__, elemento.id_usuario, delta)
+
+    @classmethod
+    def registrar_baja(cls, elemento):
+        """Descuenta del saldo un elemento eliminado"""
+        cls.registrar(elemento.__tablename__, elemento.id_usuario, -float(elemento.monto))
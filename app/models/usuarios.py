@@ -1,11 +1,30 @@
-from typing import Optional
+from typing import NamedTuple, Optional
 import sqlalchemy as sa
 import sqlalchemy.orm as so
 from flask_login import UserMixin
+from app import config as cfg
 from app.db import db
+from app.utils.ttl_cache import TTLCache
 from datetime import datetime
 
 
+class UsuarioAutenticado(NamedTuple):
+    """Campos del usuario logueado necesarios para autorizar una request"""
+    id: int
+    is_admin: bool
+    is_verified: bool
+    is_money_visible: bool
+
+    def get_id(self):
+        """Igual que UserMixin.get_id"""
+        return str(self.id)
+
+
+# Cache entre requests de los usuarios autenticados, se invalida al modificar o eliminar un usuario.
+# Es por proceso: los demas workers pueden usar datos desactualizados hasta config.USER_CACHE_TTL segundos
+_autenticados = TTLCache(cfg.USER_CACHE_MAX_SIZE, cfg.USER_CACHE_TTL)
+
+
 class Usuario(UserMixin, db.Model):
     __tablename__ = 'usuarios'
     _username_char_limit = 30
@@ -23,6 +42,7 @@ class Usuario(UserMixin, db.Model):
     is_admin: so.Mapped[bool] = so.mapped_column(sa.Boolean)
     is_verified: so.Mapped[bool] = so.mapped_column(sa.Boolean)
     is_money_visible: so.Mapped[bool] = so.mapped_column(sa.Boolean)
+    deleted_on: so.Mapped[Optional[datetime]] = so.mapped_column()  # Baja en curso: la cuenta ya no puede operar
 
     def __init__(self, username, password_hash, email, imagen = None, is_admin = False, is_verified = False, is_money_visible = True):
         self.username = username
@@ -62,8 +82,33 @@ class Usuario(UserMixin, db.Model):
     def update(self):
         """Actualiza un usuario en la base de datos"""
         db.session.commit()
+        self.invalidate_autenticado(self.id)
 
     def delete(self):
         """Elimina un usuario de la base de datos"""
+        id_usuario = self.id
         db.session.delete(self)
         db.session.commit()
+        self.invalidate_autenticado(id_usuario)
+
+    @classmethod
+    def get_autenticado(cls, id_usuario) -> Optional[UsuarioAutenticado]:
+        """Devuelve los campos de autorizacion del usuario desde la cache, o desde la base si no estan o vencieron.
+        Devuelve None si el usuario no existe o tiene la baja en curso"""
+        id_usuario = int(id_usuario)
+        usuario = _autenticados.get(id_usuario)
+        if usuario is None:
+            row = db.session.execute(
+                sa.select(cls.id, cls.is_admin, cls.is_verified, cls.is_money_visible)
+                .where(cls.id == id_usuario, cls.deleted_on.is_(None))
+            ).first()
+            if row is None:
+                return None
+            usuario = UsuarioAutenticado(*row)
+            _autenticados.set(id_usuario, usuario)
+        return usuario
+
+    @classmethod
+    def invalidate_autenticado(cls, id_usuario):
+        """Descarta de la cache los campos de autorizacion del usuario"""
+        _autenticados.invalidate(int(id_usuario))
@@ -0,0 +1,109 @@
+import datetime
+from bisect import bisect_right
+
+import click
+from sqlalchemy import func, insert, select
+
+from app.db import db
+from app.models.cotizaciones import Cotizacion
+from app.utils.exchange_rate_provider import ArgentinaDatosClient, get_rate_provider
+
+
+def sync_cotizaciones(currency: str = "usd", currency_type: str = "oficial", client: ArgentinaDatosClient = None) -> int:
+    """Carga en la tabla de cotizaciones los dias que todavia no estan guardados y devuelve cuantos se agregaron.
+    La primera ejecucion carga todo el historico disponible; las siguientes solo los dias nuevos"""
+    currency, currency_type = currency.casefold(), currency_type.casefold()
+    last_fecha = db.session.query(func.max(Cotizacion.fecha)).filter_by(
+        currency=currency, currency_type=currency_type).scalar()
+
+    nuevas = {}
+    if currency == "usd":  # Solo hay historico publicado para el dolar
+        client = client if client else ArgentinaDatosClient()
+        for item in client.fetch_history(currency_type):
+            fecha = datetime.date.fromisoformat(item["fecha"])
+            if last_fecha is None or fecha > last_fecha:
+                nuevas[fecha] = {'compra': item.get("compra"), 'venta': item["venta"]}
+
+    # La cotizacion del dia se toma de la API de cotizaciones actuales
+    hoy = datetime.date.today()
+    if (last_fecha is None or hoy > last_fecha) and hoy not in nuevas:
+        nuevas[hoy] = get_rate_provider().get_rate(currency, currency_type)
+
+    if nuevas:
+        db.session.execute(insert(Cotizacion), [
+            {'fecha': fecha, 'currency': currency, 'currency_type': currency_type,
+             'compra': cotizacion['compra'], 'venta': cotizacion['venta']}
+            for fecha, cotizacion in nuevas.items()
+        ])
+        db.session.commit()
+    return len(nuevas)
+
+
+def get_historical_rates(fechas: list, currency: str, currency_type: str = "oficial") -> dict:
+    """Devuelve {dia: venta} con la cotizacion vigente en cada dia pedido, resuelto con una sola query"""
+    currency, currency_type = currency.casefold(), currency_type.casefold()
+    dias = sorted({fecha.date() if isinstance(fecha, datetime.datetime) else fecha for fecha in fechas})
+    if not dias:
+        return {}
+
+    # Se traen las cotizaciones entre la ultima vigente al primer dia y el ultimo dia
+    desde = select(func.max(Cotizacion.fecha)).where(
+        Cotizacion.currency == currency,
+        Cotizacion.currency_type == currency_type,
+        Cotizacion.fecha <= dias[0]
+    ).scalar_subquery()
+    cotizaciones = db.session.execute(
+        select(Cotizacion.fecha, Cotizacion.venta).where(
+            Cotizacion.currency == currency,
+            Cotizacion.currency_type == currency_type,
+            Cotizacion.fecha >= func.coalesce(desde, dias[0]),
+            Cotizacion.fecha <= dias[-1]
+        ).order_by(Cotizacion.fecha)
+    ).all()
+
+    fechas_cotizacion = [cotizacion.fecha for cotizacion in cotizaciones]
+    rates = {}
+    for dia in dias:
+        index = bisect_right(fechas_cotizacion, dia) - 1
+        if index < 0:
+            raise ValueError(f"No hay cotizacion historica de '{currency}' para la fecha {dia}")
+        rates[dia] = cotizaciones[index].venta
+    return rates
+
+
+def historical_rate_column(fecha_column, currency: str, currency_type: str = "oficial"):
+    """Devuelve una subquery correlacionada con la cotizacion vigente a la fecha de cada fila"""
+    return select(Cotizacion.venta).where(
+        Cotizacion.currency == currency.casefold(),
+        Cotizacion.currency_type == currency_type.casefold(),
+        Cotizacion.fecha <= func.date(fecha_column)
+    ).order_by(Cotizacion.fecha.desc()).limit(1).scalar_subquery()
+
+
+def convert_list_to_historical_currency(contents: list, currency: str, currency_type: str = "oficial") -> list:
+    """Convierte el monto de cada elemento con la cotizacion vigente a su fecha"""
+    rates = get_historical_rates([content.fecha for content in contents], currency, currency_type)
+    for content in contents:
+        content.monto = content.monto / rates[content.fecha.date()]
+    return contents
+
+
+def historical_aggregate(query, model_object, currency: str, currency_type: str = "oficial") -> (float, int):
+    """Devuelve (suma, cantidad) de los elementos de la query, convirtiendo cada monto con la cotizacion de su fecha"""
+    rate = historical_rate_column(model_object.fecha, currency, currency_type)
+    total_value, count_value, converted_count = query.with_entities(
+        func.sum(model_object.monto / rate),
+        func.count(model_object.id),
+        func.count(rate)
+    ).one()
+    if converted_count < count_value:
+        raise ValueError(f"No hay cotizacion historica de '{currency}' para todas las fechas pedidas")
+    return (total_value if total_value else 0.0), count_value
+
+
+@click.command('sync-cotizaciones')  # Para cargar el historico de cotizaciones: flask sync-cotizaciones --currency usd --type blue
+@click.option('--currency', default="usd", help="Moneda a sincronizar")
+@click.option('--type', 'currency_type', default="oficial", help="Tipo de cotizacion a sincronizar")
+def sync_cotizaciones_command(currency, currency_type):
+    cantidad = sync_cotizaciones(currency, currency_type)
+    click.echo(f'Cotizaciones agregadas: {cantidad}')
@@ -0,0 +1,107 @@
+import threading
+
+import click
+from flask import current_app
+from sqlalchemy import delete, func, select, update
+
+from app import config as cfg
+from app.db import db
+from app.models.feedback import Feedback
+from app.models.gastos import Gasto
+from app.models.ingresos import Ingreso
+from app.models.resumenes import Resumen
+from app.models.saldos import Saldo
+from app.models.usuarios import Usuario
+
+# Tablas con filas del usuario, en orden de borrado (antes que la fila del usuario por las claves foraneas)
+TABLAS_USUARIO = (Ingreso, Gasto, Feedback, Resumen, Saldo)
+
+
+def delete_account(id_usuario: int):
+    """Elimina el usuario y todas sus filas con un DELETE por tabla, en una sola transaccion"""
+    try:
+        for model_object in TABLAS_USUARIO:
+            db.session.execute(delete(model_object).where(model_object.id_usuario == id_usuario))
+        db.session.execute(delete(Usuario).where(Usuario.id == id_usuario))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    Usuario.invalidate_autenticado(id_usuario)
+
+
+def start_account_deletion(id_usuario: int) -> bool:
+    """Inicia la baja de la cuenta en una transaccion: la marca para que ya no pueda operar (ni loguearse ni usar sus tokens)
+    y elimina sus saldos y resumenes, asi ningun total sigue contando los elementos mientras se borran por partes.
+    Devuelve False si el usuario no existe"""
+    try:
+        marcados = db.session.execute(
+            update(Usuario).where(Usuario.id == id_usuario).values(deleted_on=func.coalesce(Usuario.deleted_on, func.now()))
+        ).rowcount
+        if marcados:
+            db.session.execute(delete(Resumen).where(Resumen.id_usuario == id_usuario))
+            db.session.execute(delete(Saldo).where(Saldo.id_usuario == id_usuario))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    Usuario.invalidate_autenticado(id_usuario)
+    return bool(marcados)
+
+
+def delete_account_in_chunks(id_usuario: int, chunk_size: int = None):
+    """Elimina el usuario y todas sus filas de a 'chunk_size' filas por transaccion, para no mantener bloqueos largos.
+    La fila del usuario se elimina al final en una ultima transaccion. Se puede volver a ejecutar si se interrumpe"""
+    chunk_size = chunk_size or cfg.ACCOUNT_DELETE_CHUNK_SIZE
+    if not start_account_deletion(id_usuario):
+        return
+    for model_object in (Ingreso, Gasto, Feedback):
+        while True:
+            ids = db.session.execute(
+                select(model_object.id).where(model_object.id_usuario == id_usuario).limit(chunk_size)
+            ).scalars().all()
+            if not ids:
+                break
+            db.session.execute(delete(model_object).where(model_object.id.in_(ids)))
+            db.session.commit()
+    delete_account(id_usuario)
+
+
+def delete_account_async(id_usuario: int) -> threading.Thread:
+    """Marca la cuenta para eliminar y lanza en segundo plano el borrado por chunks. Devuelve el hilo que lo ejecuta.
+    Si el proceso se reinicia antes de terminar, el borrado se retoma con 'flask resume-account-deletions'"""
+    start_account_deletion(id_usuario)
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            try:
+                delete_account_in_chunks(id_usuario)
+            except Exception:
+                db.session.rollback()
+                app.logger.exception(f'Fallo el borrado en segundo plano del usuario {id_usuario}')
+
+    thread = threading.Thread(target=run, name=f'delete-account-{id_usuario}', daemon=True)
+    thread.start()
+    return thread
+
+
+def get_deletion_status(id_usuario: int) -> str:
+    """Devuelve el estado de la cuenta: 'activa', 'en_proceso' (baja iniciada) o 'eliminada'"""
+    row = db.session.execute(select(Usuario.deleted_on).where(Usuario.id == id_usuario)).first()
+    if row is None:
+        return 'eliminada'
+    return 'activa' if row.deleted_on is None else 'en_proceso'
+
+
+def resume_account_deletions() -> int:
+    """Completa los borrados de cuentas que quedaron interrumpidos. Devuelve la cantidad de cuentas eliminadas"""
+    ids = db.session.execute(select(Usuario.id).where(Usuario.deleted_on.is_not(None))).scalars().all()
+    for id_usuario in ids:
+        delete_account_in_chunks(id_usuario)
+    return len(ids)
+
+
+@click.command('resume-account-deletions')  # Para completar borrados interrumpidos: flask resume-account-deletions
+def resume_account_deletions_command():
+    click.echo(f'Cuentas eliminadas: {resume_account_deletions()}')
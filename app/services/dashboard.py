@@ -0,0 +1,101 @@
+import datetime
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import func, literal, select, union_all
+
+from app.db import db
+from app.models.gastos import Gasto
+from app.models.ingresos import Ingreso
+from app.services.cotizaciones import historical_rate_column
+from app.services.elemento_financiero import get_currency_args
+from app.utils.build_filters import parse_date_range
+from app.utils.exchange_rate_provider import get_rate_provider
+
+
+def _aggregate_subqueries(model_object, filters: list, rate=None) -> list:
+    """Devuelve subqueries escalares con la suma (convertida por 'rate' si se indica), la cantidad
+    y la cantidad de elementos con cotizacion de los elementos que cumplen los filtros"""
+    monto = model_object.monto / rate if rate is not None else model_object.monto
+    subqueries = [
+        select(func.coalesce(func.sum(monto), 0.0)).where(*filters).scalar_subquery(),
+        select(func.count(model_object.id)).where(*filters).scalar_subquery(),
+    ]
+    if rate is not None:
+        subqueries.append(select(func.count(rate)).where(*filters).scalar_subquery())
+    return subqueries
+
+
+def get_dashboard(args, id_usuario: int) -> (dict, int):
+    """Devuelve en un unico JSON el saldo, totales, cantidades, promedio de gastos y tipos del usuario.
+    Todos los valores numericos se calculan en una sola query y los tipos en otra"""
+
+    try:
+        fecha_inicio, fecha_fin = parse_date_range(args)
+        currency, currency_type, conversion = get_currency_args(args)
+    except ValueError as e:
+        return {"message": str(e)}, 400
+    historica = conversion == "historica" and currency != "ars".casefold()
+
+    # Totales y cantidades: entre fechas si se enviaron, sino todo el historico (igual que /total y /count)
+    # Promedio de gastos: entre fechas si se enviaron, sino el ultimo mes (igual que /average)
+    if fecha_inicio and fecha_fin:
+        promedio_inicio, promedio_fin = fecha_inicio, fecha_fin
+    else:
+        promedio_inicio = datetime.datetime.utcnow() - relativedelta(months=1)
+        promedio_fin = datetime.datetime.utcnow()
+
+    ingresos_filters = [Ingreso.id_usuario == id_usuario]
+    gastos_filters = [Gasto.id_usuario == id_usuario]
+    if fecha_inicio and fecha_fin:
+        ingresos_filters += [Ingreso.fecha >= fecha_inicio, Ingreso.fecha <= fecha_fin]
+        gastos_filters += [Gasto.fecha >= fecha_inicio, Gasto.fecha <= fecha_fin]
+    promedio_filters = [Gasto.id_usuario == id_usuario, Gasto.fecha >= promedio_inicio, Gasto.fecha <= promedio_fin]
+
+    # Cada grupo es (suma, cantidad[, cantidad con cotizacion historica])
+    ingresos_rate = historical_rate_column(Ingreso.fecha, currency, currency_type) if historica else None
+    gastos_rate = historical_rate_column(Gasto.fecha, currency, currency_type) if historica else None
+    groups = [
+        _aggregate_subqueries(Ingreso, ingresos_filters, ingresos_rate),
+        _aggregate_subqueries(Gasto, gastos_filters, gastos_rate),
+        _aggregate_subqueries(Gasto, promedio_filters, gastos_rate),
+    ]
+    row = db.session.execute(select(*[subquery for group in groups for subquery in group])).one()
+    group_size = len(groups[0])
+    ingresos, gastos, promedio = [row[i:i + group_size] for i in range(0, len(row), group_size)]
+
+    if historica and any(group[2] < group[1] for group in (ingresos, gastos, promedio)):
+        return {"message": f"No hay cotizacion historica de '{currency}' para todas las fechas pedidas"}, 400
+
+    # Con conversion actual se usa una unica cotizacion para toda la respuesta
+    currency_venta = 1.0
+    if not historica and currency != "ars".casefold():
+        try:
+            currency_venta = get_rate_provider().get_venta(currency, currency_type)
+        except Exception as e:
+            return {"message": str(e)}, 400
+
+    ingresos_total, ingresos_count = ingresos[0] / currency_venta, ingresos[1]
+    gastos_total, gastos_count = gastos[0] / currency_venta, gastos[1]
+    promedio_value = promedio[0] / currency_venta / promedio[1] if promedio[1] else 0.0
+
+    tipos = db.session.execute(union_all(
+        select(literal('ingresos').label('tabla'), Ingreso.tipo).where(Ingreso.id_usuario == id_usuario).distinct(),
+        select(literal('gastos').label('tabla'), Gasto.tipo).where(Gasto.id_usuario == id_usuario).distinct()
+    )).all()
+    info_cotizaciones = {"cotizacion": currency, "tipo_de_cotizacion": currency_type, "conversion": conversion}
+
+    return {
+        'saldo': format(ingresos_total - gastos_total, ".2f"),
+        'ingresos': {
+            'total': format(ingresos_total, ".2f"),
+            'count': ingresos_count,
+            'tipos': [tipo.tipo for tipo in tipos if tipo.tabla == 'ingresos']
+        },
+        'gastos': {
+            'total': format(gastos_total, ".2f"),
+            'count': gastos_count,
+            'average': format(promedio_value, ".2f"),
+            'tipos': [tipo.tipo for tipo in tipos if tipo.tabla == 'gastos']
+        },
+        'additional_info': info_cotizaciones
+    }, 200
@@ -1,16 +1,34 @@
 import datetime
 
 from dateutil.relativedelta import relativedelta
-from sqlalchemy import func, and_
+from sqlalchemy import and_, func
 
 from flask import g
 
-from app.models.usuarios import Usuario
-from app.utils.build_criterion import build_criterion
+from app import config as cfg
+from app.services.cotizaciones import convert_list_to_historical_currency, historical_aggregate, historical_rate_column
+from app.services.resumenes import aggregate_range
+from app.utils.build_criterion import build_criterion, build_query
 from app.utils.convert_to_foreign_currency import convert_to_foreign_currency, convert_list_to_foreign_currency
+from app.utils.date_buckets import GRANULARIDADES, as_date, as_datetime, bucket_count, bucket_expression, bucket_start, next_bucket
+from app.utils.exchange_rate_provider import get_rate_provider
 
-from app.utils.paginated_query import paginated_query
-from app.utils.build_filters import build_filters
+from app.utils.keyset_pagination import fetch_keyset_page
+from app.utils.paginated_query import build_page, fetch_page
+from app.utils.build_filters import build_filters, parse_date_range
+
+
+def get_currency_args(args) -> (str, str, str):
+    """Devuelve (moneda, tipo de cotizacion, modo de conversion) a partir de los parametros de la request.
+    La conversion 'actual' usa la cotizacion de hoy y la 'historica' la vigente a la fecha de cada elemento"""
+    currency = args.get('currency', default="ars", type=str)
+    currency_type = "oficial"
+    if currency == "usd".casefold():
+        currency_type = args.get('currency_type', default="oficial", type=str)
+    conversion = args.get('conversion', default="actual", type=str)
+    if conversion not in ("actual", "historica"):
+        raise ValueError("Parametro invalido en 'conversion'")
+    return currency, currency_type, conversion
 
 
 def get_tipos_distinct(model_object) -> list:
@@ -22,31 +40,38 @@ def get_tipos_distinct(model_object) -> list:
 
 
 def get_all(args, model_object, contents_name: str = "elementos") -> (dict, int):
-    """Devuelve un JSON con info de todos los elementos generados por un usuario en base a diferentes filtros"""
+    """Devuelve un JSON con info de todos los elementos generados por un usuario en base a diferentes filtros.
+    Si se envia el parametro 'cursor' (vacio para la primera pagina) se pagina por cursor en lugar de por numero de pagina
+    (con los criterios de orden por fecha, los de monto solo admiten paginado por numero de pagina)"""
 
     # Realizo los seteos necesarios para el paginado
+    keyset_mode = 'cursor' in args
     page_number = args.get('page', default=1, type=int)
     page_size = args.get('page_size', default=10, type=int)
     if page_size <= 0 or page_number <= 0:
         return {'message': 'Los campos de paginado no admiten valores negativos o cero'}, 400
 
     try:
-        current_user = Usuario.query.filter_by(id=g.user_id).first()
+        currency, currency_type, conversion = get_currency_args(args)
+        current_user = g.current_user
         filters = build_filters(args, current_user, model_object, True)
-        contents = build_criterion(args, filters, model_object, True)
+        # Solo se trae de la base la pagina pedida
+        if keyset_mode:
+            contents, next_cursor = fetch_keyset_page(args, filters, model_object, page_size)
+        else:
+            contents, total_entries = fetch_page(build_query(args, filters, model_object), page_number, page_size)
     except ValueError as e:
         return {"message": str(e)}, 400
 
-    currency = args.get('currency', default="ars", type=str)
-    currency_type = "oficial"
     if contents and currency != "ars".casefold():
-        if currency == "usd".casefold():
-            currency_type = args.get('currency_type', default="oficial", type=str)
         try:
-            contents = convert_list_to_foreign_currency(contents, currency, currency_type)
+            if conversion == "historica":
+                contents = convert_list_to_historical_currency(contents, currency, currency_type)
+            else:
+                contents = convert_list_to_foreign_currency(contents, currency, currency_type)
         except Exception as e:
             return {"message": str(e)}, 400
-    info_cotizaciones = {"cotizacion": currency, "tipo_de_cotizacion": currency_type}
+    info_cotizaciones = {"cotizacion": currency, "tipo_de_cotizacion": currency_type, "conversion": conversion}
 
     output = []
     for content in contents:
@@ -59,30 +84,34 @@ def get_all(args, model_object, contents_name: str = "elementos") -> (dict, int)
             'id_usuario': content.id_usuario
         })
 
-    return paginated_query(page_number, page_size, output, contents_name, info_cotizaciones)
+    if keyset_mode:
+        return {'page_size': page_size,
+                'next_cursor': next_cursor,
+                'additional_info': info_cotizaciones,
+                contents_name: output}, 200
+    return build_page(page_number, page_size, total_entries, output, contents_name, info_cotizaciones)
 
 
 def get(args, model_object, content_name: str = "elemento") -> (dict, int):
     """Devuelve un JSON con info de un elemento generado por un usuario en base a diferentes filtros"""
 
     try:
-        current_user = Usuario.query.filter_by(id=g.user_id).first()
+        currency, currency_type, conversion = get_currency_args(args)
+        current_user = g.current_user
         filters = build_filters(args, current_user, model_object, False)
         content = build_criterion(args, filters, model_object, False)
     except ValueError as e:
         return {"message": str(e)}, 400
 
-    currency = args.get('currency', default="ars", type=str)
-    currency_type = "oficial"
     if content and currency != "ars".casefold():
-        if currency == "usd".casefold():
-            currency_type = args.get('currency_type', default="oficial", type=str)
         try:
-            monto_convertido = convert_to_foreign_currency(content.monto, currency, currency_type)
+            if conversion == "historica":
+                convert_list_to_historical_currency([content], currency, currency_type)
+            else:
+                content.monto = convert_to_foreign_currency(content.monto, currency, currency_type)
         except Exception as e:
             return {"message": str(e)}, 400
-        content.monto = monto_convertido
-    info_cotizaciones = {"cotizacion": currency, "tipo_de_cotizacion": currency_type}
+    info_cotizaciones = {"cotizacion": currency, "tipo_de_cotizacion": currency_type, "conversion": conversion}
 
     output = {}
     if content:
@@ -98,6 +127,73 @@ def get(args, model_object, content_name: str = "elemento") -> (dict, int):
     return {content_name: output, 'additional_info': info_cotizaciones}, 200
 
 
+def build_bulk_filters(json, model_object) -> list:
+    """Devuelve los filtros de una operacion masiva a partir de una lista de 'ids' o de 'filters' (los mismos de get_all).
+    El usuario logueado solo puede afectar sus propios elementos, salvo que sea admin"""
+    if not isinstance(json, dict):
+        raise ValueError("Debe indicar 'ids' o 'filters'")
+    current_user = g.current_user
+
+    ids = json.get("ids")
+    if ids is not None:
+        if not isinstance(ids, list) or not ids or not all(isinstance(id_elemento, int) for id_elemento in ids):
+            raise ValueError("Parametro invalido en 'ids'")
+        if len(ids) > cfg.BULK_MAX_ITEMS:
+            raise ValueError(f'No se permiten mas de {cfg.BULK_MAX_ITEMS} elementos por request')
+        filters = [model_object.id.in_(ids)]
+        if not current_user.is_admin:
+            filters.append(model_object.id_usuario == current_user.get_id())
+        return filters
+
+    params = json.get("filters")
+    if not isinstance(params, dict):
+        raise ValueError("Debe indicar 'ids' o 'filters'")
+    filters = build_filters(params, current_user, model_object, True)
+    # Sin ningun filtro efectivo la operacion alcanzaria a todos los elementos del usuario
+    if len(filters) == len(build_filters({}, current_user, model_object, True)):
+        raise ValueError("Debe indicar al menos un filtro en 'filters'")
+    return filters
+
+
+def bulk_delete(json, model_object, contents_name: str = "elementos") -> (dict, int):
+    """Elimina con una sola sentencia los elementos indicados por 'ids' o por 'filters'"""
+    try:
+        filters = build_bulk_filters(json, model_object)
+    except ValueError as e:
+        return {"message": str(e)}, 400
+
+    deleted = model_object.bulk_delete(filters)
+    return {
+        'message': f'{contents_name} eliminados exitosamente',
+        'deleted': deleted
+    }, 200
+
+
+def bulk_update_tipo(json, model_object, contents_name: str = "elementos") -> (dict, int):
+    """Cambia con una sola sentencia el 'tipo' de los elementos indicados por 'ids' o por 'filters'"""
+    tipo = json.get("tipo") if isinstance(json, dict) else None
+    if not tipo or not isinstance(tipo, str):
+        return {
+            'message': 'Uno o más campos de entrada obligatorios se encuentran vacios'
+        }, 400
+    if len(tipo) > model_object._tipo_char_limit:
+        return {
+            'message': 'Uno o más campos de entrada superan la cantidad maxima de caracteres permitidos.',
+            'tipo_max_characters': f"{model_object._tipo_char_limit}"
+        }, 400
+
+    try:
+        filters = build_bulk_filters(json, model_object)
+    except ValueError as e:
+        return {"message": str(e)}, 400
+
+    updated = model_object.bulk_update_tipo(filters, tipo)
+    return {
+        'message': f'{contents_name} actualizados exitosamente',
+        'updated': updated
+    }, 200
+
+
 def average(args, model_object) -> (dict, int):
     """Devuelve un JSON con el monto promedio entre fechas de los elementos de un usuario"""
 
@@ -120,22 +216,35 @@ def average(args, model_object) -> (dict, int):
         fecha_inicio = datetime.datetime.utcnow() - relativedelta(months=1)
         fecha_fin = datetime.datetime.utcnow()
 
-    average_value = model_object.query.with_entities(func.avg(model_object.monto)).filter(
+    try:
+        currency, currency_type, conversion = get_currency_args(args)
+    except ValueError as e:
+        return {"message": str(e)}, 400
+
+    query = model_object.query.filter(
+        model_object.id_usuario == g.user_id,
         model_object.fecha >= fecha_inicio,
         model_object.fecha <= fecha_fin
-    ).scalar()
-    average_value = average_value if average_value else 0.0  # Devuelve None si no trae datos de query
+    )
 
-    currency = args.get('currency', default="ars", type=str)
-    currency_type = "oficial"
-    if average_value and currency != "ars".casefold():
-        if currency == "usd".casefold():
-            currency_type = args.get('currency_type', default="oficial", type=str)
+    if conversion == "historica" and currency != "ars".casefold():
+        # Cada monto se convierte con la cotizacion de su fecha dentro de la misma query
         try:
-            average_value = convert_to_foreign_currency(average_value, currency, currency_type)
-        except Exception as e:
+            total_value, count_value = historical_aggregate(query, model_object, currency, currency_type)
+        except ValueError as e:
             return {"message": str(e)}, 400
-    info_cotizaciones = {"cotizacion": currency, "tipo_de_cotizacion": currency_type}
+        average_value = total_value / count_value if count_value else 0.0
+    else:
+        # Los periodos completos se leen de los resumenes semanales/mensuales
+        total_value, count_value = aggregate_range(model_object, g.user_id, fecha_inicio, fecha_fin)
+        average_value = total_value / count_value if count_value else 0.0
+
+        if average_value and currency != "ars".casefold():
+            try:
+                average_value = convert_to_foreign_currency(average_value, currency, currency_type)
+            except Exception as e:
+                return {"message": str(e)}, 400
+    info_cotizaciones = {"cotizacion": currency, "tipo_de_cotizacion": currency_type, "conversion": conversion}
 
     return {'average': format(average_value, ".2f"), 'additional_info': info_cotizaciones}, 200
 
@@ -146,7 +255,7 @@ def total(args, model_object) -> (dict, int):
     fecha_inicio = args.get('fecha_inicio')
     fecha_fin = args.get('fecha_fin')
 
-    filters = []
+    filters = [model_object.id_usuario == g.user_id]
     if fecha_inicio and fecha_fin:
         try:
             fecha_inicio = datetime.datetime.strptime(fecha_inicio, '%Y-%m-%d')
@@ -161,20 +270,33 @@ def total(args, model_object) -> (dict, int):
             }, 400
         filters.append(and_(model_object.fecha >= fecha_inicio, model_object.fecha <= fecha_fin))
 
+    try:
+        currency, currency_type, conversion = get_currency_args(args)
+    except ValueError as e:
+        return {"message": str(e)}, 400
+
     # Si existe fecha_inicio, fecha_fin filtro por eso. Sino, devuelvo la suma total
-    total_value = model_object.query.with_entities(func.sum(model_object.monto)).filter(*filters).scalar()
-    total_value = total_value if total_value else 0.0  # Devuelve None si no trae datos de query
+    query = model_object.query.filter(*filters)
 
-    currency = args.get('currency', default="ars", type=str)
-    currency_type = "oficial"
-    if total_value and currency != "ars".casefold():
-        if currency == "usd".casefold():
-            currency_type = args.get('currency_type', default="oficial", type=str)
+    if conversion == "historica" and currency != "ars".casefold():
+        # Cada monto se convierte con la cotizacion de su fecha dentro de la misma query
         try:
-            total_value = convert_to_foreign_currency(total_value, currency, currency_type)
-        except Exception as e:
+            total_value, _ = historical_aggregate(query, model_object, currency, currency_type)
+        except ValueError as e:
             return {"message": str(e)}, 400
-    info_cotizaciones = {"cotizacion": currency, "tipo_de_cotizacion": currency_type}
+    else:
+        # Los periodos completos se leen de los resumenes semanales/mensuales
+        if fecha_inicio and fecha_fin:
+            total_value, _ = aggregate_range(model_object, g.user_id, fecha_inicio, fecha_fin)
+        else:
+            total_value, _ = aggregate_range(model_object, g.user_id)
+
+        if total_value and currency != "ars".casefold():
+            try:
+                total_value = convert_to_foreign_currency(total_value, currency, currency_type)
+            except Exception as e:
+                return {"message": str(e)}, 400
+    info_cotizaciones = {"cotizacion": currency, "tipo_de_cotizacion": currency_type, "conversion": conversion}
 
     return {'total': format(total_value, ".2f"), 'additional_info': info_cotizaciones}, 200
 
@@ -185,7 +307,6 @@ def count(args, model_object) -> (dict, int):
     fecha_inicio = args.get('fecha_inicio')
     fecha_fin = args.get('fecha_fin')
 
-    filters = []
     if fecha_inicio and fecha_fin:
         try:
             fecha_inicio = datetime.datetime.strptime(fecha_inicio, '%Y-%m-%d')
@@ -198,61 +319,190 @@ def count(args, model_object) -> (dict, int):
             return {
                 'message': 'La fecha de inicio debe ser anterior a la fecha de fin'
             }, 400
+        # Los periodos completos se leen de los resumenes semanales/mensuales
+        _, count_value = aggregate_range(model_object, g.user_id, fecha_inicio, fecha_fin)
+    else:
+        # Sin fecha_inicio, fecha_fin devuelvo la cantidad total
+        _, count_value = aggregate_range(model_object, g.user_id)
+
+    return {'count': count_value}, 200
+
+
+def series(args, model_object) -> (dict, int):
+    """Devuelve un JSON con el total, cantidad y promedio por periodo (dia, semana, mes o anio) entre fechas de los elementos de un usuario.
+    Todos los periodos se calculan con una sola query agrupada y los periodos sin elementos se completan en cero"""
+
+    granularidad = args.get('granularidad', default="mes", type=str)
+    try:
+        fecha_inicio, fecha_fin = parse_date_range(args)
+        currency, currency_type, conversion = get_currency_args(args)
+    except ValueError as e:
+        return {"message": str(e)}, 400
+    if not (fecha_inicio and fecha_fin):
+        return {
+            'message': 'Uno o más campos de entrada obligatorios estan faltantes'
+        }, 400
+    if granularidad not in GRANULARIDADES:
+        return {"message": "Parametro invalido en 'granularidad'"}, 400
+    if bucket_count(fecha_inicio, fecha_fin, granularidad) > cfg.SERIES_MAX_BUCKETS:
+        return {'message': f'No se permiten mas de {cfg.SERIES_MAX_BUCKETS} periodos por request'}, 400
+
+    historica = conversion == "historica" and currency != "ars".casefold()
+    periodo = bucket_expression(model_object.fecha, granularidad)
+    columns = [periodo, func.count(model_object.id)]
+    if historica:  # Cada monto se convierte con la cotizacion de su fecha dentro de la misma query
+        rate = historical_rate_column(model_object.fecha, currency, currency_type)
+        columns += [func.sum(model_object.monto / rate), func.count(rate)]
+    else:
+        columns += [func.sum(model_object.monto)]
+
+    rows = model_object.query.with_entities(*columns).filter(
+        model_object.id_usuario == g.user_id,
+        model_object.fecha >= fecha_inicio,
+        model_object.fecha <= fecha_fin
+    ).group_by(periodo).all()
+
+    # Con conversion actual se usa una unica cotizacion para toda la respuesta
+    currency_venta = 1.0
+    if rows and not historica and currency != "ars".casefold():
+        try:
+            currency_venta = get_rate_provider().get_venta(currency, currency_type)
+        except Exception as e:
+            return {"message": str(e)}, 400
+
+    totales = {}
+    for row in rows:
+        if historica and row[3] < row[1]:
+            return {"message": f"No hay cotizacion historica de '{currency}' para todas las fechas pedidas"}, 400
+        totales[as_date(row[0])] = ((row[2] or 0.0) / currency_venta, row[1])
+
+    output = []
+    current_periodo = bucket_start(fecha_inicio, granularidad)
+    last_periodo = bucket_start(fecha_fin, granularidad)
+    while current_periodo <= last_periodo:
+        total_value, count_value = totales.get(current_periodo, (0.0, 0))
+        output.append({
+            'periodo': current_periodo.isoformat(),
+            'total': format(total_value, ".2f"),
+            'count': count_value,
+            'average': format(total_value / count_value if count_value else 0.0, ".2f")
+        })
+        current_periodo = next_bucket(current_periodo, granularidad)
+    info_cotizaciones = {"cotizacion": currency, "tipo_de_cotizacion": currency_type, "conversion": conversion}
+
+    return {'granularidad': granularidad, 'series': output, 'additional_info': info_cotizaciones}, 200
+
+
+def breakdown(args, model_object) -> (dict, int):
+    """Devuelve un JSON con el total, cantidad, promedio y porcentaje del total por tipo de los elementos de un usuario.
+    Se calcula con una sola query agrupada por tipo; con 'top' se devuelven los N tipos de mayor total y el resto se agrupa en 'Otros'"""
+
+    top = args.get('top', type=int)
+    try:
+        fecha_inicio, fecha_fin = parse_date_range(args)
+        currency, currency_type, conversion = get_currency_args(args)
+    except ValueError as e:
+        return {"message": str(e)}, 400
+    if top is not None and top <= 0:
+        return {"message": "Parametro invalido en 'top'"}, 400
+
+    filters = [model_object.id_usuario == g.user_id]
+    if fecha_inicio and fecha_fin:
         filters.append(and_(model_object.fecha >= fecha_inicio, model_object.fecha <= fecha_fin))
 
-    # Si existe fecha_inicio, fecha_fin filtro por eso. Sino, devuelvo la cantidad total
-    count_value = model_object.query.with_entities(func.count(model_object.monto)).filter(*filters).scalar()
-    count_value = count_value if count_value else 0  # Devuelve None si no trae datos de query
+    historica = conversion == "historica" and currency != "ars".casefold()
+    columns = [model_object.tipo, func.count(model_object.id)]
+    if historica:  # Cada monto se convierte con la cotizacion de su fecha dentro de la misma query
+        rate = historical_rate_column(model_object.fecha, currency, currency_type)
+        columns += [func.sum(model_object.monto / rate), func.count(rate)]
+    else:
+        columns += [func.sum(model_object.monto)]
+    total_column = columns[2]
 
-    return {'count': count_value}, 200
+    rows = model_object.query.with_entities(*columns).filter(*filters).group_by(
+        model_object.tipo).order_by(total_column.desc()).all()
+
+    # Con conversion actual se usa una unica cotizacion para toda la respuesta
+    currency_venta = 1.0
+    if rows and not historica and currency != "ars".casefold():
+        try:
+            currency_venta = get_rate_provider().get_venta(currency, currency_type)
+        except Exception as e:
+            return {"message": str(e)}, 400
+    if historica and any(row[3] < row[1] for row in rows):
+        return {"message": f"No hay cotizacion historica de '{currency}' para todas las fechas pedidas"}, 400
 
+    tipos = [(row[0], (row[2] or 0.0) / currency_venta, row[1]) for row in rows]
+    if top is not None and len(tipos) > top:
+        otros = tipos[top:]
+        tipos = tipos[:top] + [('Otros', sum(tipo[1] for tipo in otros), sum(tipo[2] for tipo in otros))]
 
-def add(json, model_object) -> (dict, int):
-    """Agrega un elemento al usuario logueado"""
+    total_value = sum(tipo[1] for tipo in tipos)
+    output = []
+    for tipo, tipo_total, tipo_count in tipos:
+        output.append({
+            'tipo': tipo,
+            'total': format(tipo_total, ".2f"),
+            'count': tipo_count,
+            'average': format(tipo_total / tipo_count if tipo_count else 0.0, ".2f"),
+            'porcentaje': format(tipo_total * 100 / total_value if total_value else 0.0, ".2f")
+        })
+    info_cotizaciones = {"cotizacion": currency, "tipo_de_cotizacion": currency_type, "conversion": conversion}
+
+    return {'total': format(total_value, ".2f"), 'tipos': output, 'additional_info': info_cotizaciones}, 200
+
+
+def validate_add(json, model_object) -> (dict, dict):
+    """Valida los datos de un elemento a agregar.
+    Devuelve (datos validados, None) o (None, mensaje de error)"""
     # Obtengo los datos necesarios para crear el elemento desde json enviado en el body
     try:
         descripcion = json["descripcion"]
         monto = json["monto"]
         tipo = json["tipo"]
-    except KeyError:
-        return {
+    except (KeyError, TypeError):
+        return None, {
             'message': 'Uno o más campos de entrada obligatorios estan faltantes'
-        }, 400
-    try:
-        fecha = json["fecha"]
-    except KeyError:
-        fecha = None
+        }
+    fecha = json.get("fecha")
 
 # ---------- INICIO DE VALIDACIONES ---------------------
 
     if not monto or not tipo:
-        return {
+        return None, {
             'message': 'Uno o más campos de entrada obligatorios se encuentran vacios'
-        }, 400
+        }
 
     try:
         if float(monto) < 0.0:
-            return {
+            return None, {
                 'message': 'monto negativo'  # 'No se permite crear elementos con monto negativo'
-            }, 400
-    except ValueError:
-        return {
+            }
+    except (ValueError, TypeError):
+        return None, {
             'message': "Valor invalido en 'monto'"  # 'No se permite crear elementos con monto invalido'
-        }, 400
-
-    # Creo el elemento
-    elemento = model_object(g.user_id, descripcion, monto, tipo, fecha)
+        }
 
-    if len(descripcion) > elemento.descripcion_char_limit or len(tipo) > elemento.tipo_char_limit:  # 'superan los caracteres maximos permitidos'
-        return {
+    if len(descripcion) > model_object._descripcion_char_limit or len(tipo) > model_object._tipo_char_limit:  # 'superan los caracteres maximos permitidos'
+        return None, {
             'message': 'Uno o más campos de entrada superan la cantidad maxima de caracteres permitidos.',
-            'descripcion_max_characters': f"{elemento.descripcion_char_limit}",
-            'tipo_max_characters': f"{elemento.tipo_char_limit}"
-        }, 400
+            'descripcion_max_characters': f"{model_object._descripcion_char_limit}",
+            'tipo_max_characters': f"{model_object._tipo_char_limit}"
+        }
 
     # ---------- FIN DE VALIDACIONES ---------------------
 
-    # Cargo el elemento en la base de datos
+    return {'descripcion': descripcion, 'monto': monto, 'tipo': tipo, 'fecha': fecha}, None
+
+
+def add(json, model_object) -> (dict, int):
+    """Agrega un elemento al usuario logueado"""
+    values, error = validate_add(json, model_object)
+    if error:
+        return error, 400
+
+    # Creo el elemento y lo cargo en la base de datos
+    elemento = model_object(g.user_id, values['descripcion'], values['monto'], values['tipo'], values['fecha'])
     model_object.create(elemento)
 
     return {
@@ -260,6 +510,58 @@ def add(json, model_object) -> (dict, int):
     }, 201
 
 
+def bulk_add(json, model_object) -> (dict, int):
+    """Agrega varios elementos al usuario logueado en una sola transaccion.
+    Body: {"items": [...], "all_or_nothing": bool}. Con 'all_or_nothing' no se agrega ningun elemento si alguno es invalido;
+    sino se agregan los validos. Devuelve el resultado de cada elemento en el orden recibido"""
+    if not isinstance(json, dict) or not isinstance(json.get("items"), list):
+        return {'message': "Se esperaba una lista de elementos en 'items'"}, 400
+    items = json["items"]
+    all_or_nothing = bool(json.get("all_or_nothing", False))
+    if not items:
+        return {'message': 'La lista de elementos esta vacia'}, 400
+    if len(items) > cfg.BULK_MAX_ITEMS:
+        return {'message': f'No se permiten mas de {cfg.BULK_MAX_ITEMS} elementos por request'}, 400
+
+    results = []
+    valid_values = []
+    for index, item in enumerate(items):
+        values, error = validate_add(item, model_object)
+        if not error and values['fecha']:
+            try:
+                values['fecha'] = as_datetime(values['fecha'])
+            except (ValueError, TypeError):
+                error = {'message': 'Formato de fecha incorrecto'}
+        if error:
+            results.append({'index': index, 'status': 400, **error})
+        else:
+            results.append({'index': index, 'status': 201})
+            valid_values.append(values)
+
+    invalid_count = len(items) - len(valid_values)
+    if not valid_values or (all_or_nothing and invalid_count):
+        # Los elementos validos tampoco se registraron por la falla de los demas
+        for result in results:
+            if result['status'] == 201:
+                result.update({'status': 409, 'message': 'No registrado: la operacion se revirtio por elementos invalidos'})
+        return {
+            'message': 'No se registro ningun elemento',
+            'created': 0,
+            'failed': invalid_count,
+            'results': results
+        }, 400
+
+    # Todos los elementos validos se insertan en una sola sentencia y transaccion
+    model_object.bulk_create(g.user_id, valid_values)
+
+    return {
+        'message': 'Elementos registrados exitosamente' if not invalid_count else 'Algunos elementos no se registraron',
+        'created': len(valid_values),
+        'failed': invalid_count,
+        'results': results
+    }, 201 if not invalid_count else 207
+
+
 def update(json, model_object, content_name: str = "elemento") -> (dict, int):
     """Actualiza un elemento al usuario logueado"""
     # Obtengo los datos necesarios para actualizar el elemento desde json enviado en el body
@@ -283,7 +585,7 @@ def update(json, model_object, content_name: str = "elemento") -> (dict, int):
         }, 400
 
     # Obtengo el id de usuario del token
-    current_user: Usuario = Usuario.query.filter_by(id=g.user_id).first()
+    current_user = g.current_user
 
     # ---------- INICIO DE VALIDACIONES ---------------------
 
@@ -300,7 +602,7 @@ def update(json, model_object, content_name: str = "elemento") -> (dict, int):
     # Busco el elemento
     elemento = model_object.query.filter_by(id=id_elemento).first()
 
-    if not (elemento and (current_user.is_admin or elemento.id_usuario != g.user_id)):
+    if not (elemento and (current_user.is_admin or elemento.id_usuario == int(g.user_id))):
         return {
             'message': 'No se ha encontrado el elemento'
         }, 404
@@ -334,11 +636,11 @@ def delete(args, model_object, content_name: str = "elemento") -> (dict, int):
 
     id_elemento = args.get('id', type=int)
     # Obtengo el id de usuario del token
-    current_user: Usuario = Usuario.query.filter_by(id=g.user_id).first()
+    current_user = g.current_user
 
     elemento = model_object.query.filter_by(id=id_elemento).first()
 
-    if not (elemento and (current_user.is_admin or elemento.id_usuario != g.user_id)):
+    if not (elemento and (current_user.is_admin or elemento.id_usuario == int(g.user_id))):
         return {
             'message': f'No se ha encontrado el {content_name}'
         }, 404
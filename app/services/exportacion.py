@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+
+from flask import Response, g, stream_with_context
+from sqlalchemy import func, select
+
+from app import config as cfg
+from app.db import db
+from app.services.cotizaciones import historical_rate_column
+from app.services.elemento_financiero import get_currency_args
+from app.utils.build_filters import build_filters
+from app.utils.exchange_rate_provider import get_rate_provider
+
+EXPORT_FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+EXPORT_FIELDS = ('id', 'fecha', 'monto', 'tipo', 'descripcion')
+
+
+def _csv_lines(rows):
+    """Genera el CSV linea a linea"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson_lines(rows):
+    """Genera un objeto JSON por linea"""
+    for row in rows:
+        yield json.dumps(dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False) + '\n'
+
+
+def export(args, model_object, contents_name: str = "elementos") -> (object, int):
+    """Devuelve una respuesta que transmite todos los elementos del usuario (con los filtros de get_all) en CSV o NDJSON.
+    Las filas se leen de la base con un cursor del lado del servidor de a config.EXPORT_YIELD_PER,
+    asi la memoria usada no depende de la cantidad de elementos"""
+
+    formato = args.get('format', default='csv', type=str).casefold()
+    if formato not in EXPORT_FORMATS:
+        return {"message": "Parametro invalido en 'format'"}, 400
+
+    try:
+        currency, currency_type, conversion = get_currency_args(args)
+        current_user = g.current_user
+        filters = build_filters(args, current_user, model_object, True)
+    except ValueError as e:
+        return {"message": str(e)}, 400
+
+    monto = model_object.monto
+    if currency != "ars".casefold():
+        if conversion == "historica":
+            # Cada monto se convierte con la cotizacion de su fecha dentro de la misma query
+            rate = historical_rate_column(model_object.fecha, currency, currency_type)
+            missing_rates = db.session.execute(
+                select(func.count(model_object.id) - func.count(rate)).where(*filters)
+            ).scalar()
+            if missing_rates:
+                return {"message": f"No hay cotizacion historica de '{currency}' para todas las fechas pedidas"}, 400
+            monto = monto / rate
+        else:
+            try:
+                # Una sola cotizacion para toda la exportacion
+                monto = monto / get_rate_provider().get_venta(currency, currency_type)
+            except Exception as e:
+                return {"message": str(e)}, 400
+
+    query = select(
+        model_object.id, model_object.fecha, monto, model_object.tipo, model_object.descripcion
+    ).where(*filters).order_by(model_object.fecha, model_object.id)
+
+    def rows():
+        result = db.session.execute(query.execution_options(yield_per=cfg.EXPORT_YIELD_PER))
+        try:
+            for row in result:
+                yield row.id, row.fecha.isoformat(), format(row[2], ".2f"), row.tipo, row.descripcion
+        finally:
+            result.close()
+
+    lines = _csv_lines(rows()) if formato == 'csv' else _ndjson_lines(rows())
+    return Response(
+        stream_with_context(lines),
+        mimetype=EXPORT_FORMATS[formato],
+        headers={'Content-Disposition': f'attachment; filename={contents_name}.{formato}'}
+    ), 200
@@ -0,0 +1,135 @@
+import codecs
+from itertools import islice
+
+from flask import g
+from sqlalchemy import select
+
+from app import config as cfg
+from app.db import db
+from app.services.elemento_financiero import validate_add
+from app.utils.import_parsers import iter_csv_rows, iter_ofx_rows, ofx_to_fields, parse_fecha, parse_monto
+
+IMPORT_FORMATS = ('csv', 'ofx')
+
+
+def _parse_rows(file, args, model_object):
+    """Genera (numero de linea, campos del elemento o None, mensaje de error o None) por cada fila del archivo"""
+    formato = (args.get('format') or file.filename.rsplit('.', 1)[-1]).casefold()
+    if formato not in IMPORT_FORMATS:
+        raise ValueError("Parametro invalido en 'format'")
+    tipo_default = args.get('tipo', default='Importado', type=str)
+    encoding = args.get('encoding') or ('latin-1' if formato == 'ofx' else 'utf-8-sig')
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
+        raise ValueError("Parametro invalido en 'encoding'")
+
+    if formato == 'ofx':
+        for line, transaccion in iter_ofx_rows(file.stream, encoding=encoding):
+            try:
+                fields = ofx_to_fields(transaccion)
+            except ValueError as e:
+                yield line, None, str(e)
+                continue
+            # El signo del monto indica si la transaccion es un gasto (debito) o un ingreso (credito)
+            if (fields['monto'] < 0) != (model_object.__tablename__ == 'gastos'):
+                continue
+            fields['monto'] = abs(fields['monto'])
+            fields['tipo'] = args.get('tipo') or fields['tipo'] or tipo_default
+            yield line, fields, None
+        return
+
+    columns = {field: args.get(f'col_{field}', default=field, type=str) for field in ('fecha', 'monto', 'descripcion', 'tipo')}
+    date_format = args.get('date_format')
+    decimal = args.get('decimal', default='.', type=str)
+    delimiter = args.get('delimiter', default=',', type=str)
+    for line, row in iter_csv_rows(file.stream, columns, delimiter=delimiter, encoding=encoding):
+        try:
+            fields = {
+                'fecha': parse_fecha(row['fecha'], date_format),
+                'monto': parse_monto(row['monto'], decimal),
+                'descripcion': (row['descripcion'] or '').strip(),
+                'tipo': (row['tipo'] or '').strip() or tipo_default,
+            }
+        except ValueError as e:
+            yield line, None, str(e)
+            continue
+        yield line, fields, None
+
+
+def _dedupe_key(fecha, monto, descripcion) -> tuple:
+    """Clave de deduplicacion. El monto se redondea a centavos porque la columna es de punto flotante"""
+    return fecha, round(float(monto), 2), descripcion
+
+
+def _existing_keys(model_object, id_usuario: int, chunk: list) -> set:
+    """Devuelve las claves de deduplicacion de los elementos del usuario en las fechas del chunk,
+    con una sola query sobre el indice (id_usuario, fecha)"""
+    fechas = {fields['fecha'] for fields in chunk}
+    existing = db.session.execute(
+        select(model_object.fecha, model_object.monto, model_object.descripcion).where(
+            model_object.id_usuario == id_usuario,
+            model_object.fecha.in_(fechas)
+        )
+    ).all()
+    return {_dedupe_key(row.fecha, row.monto, row.descripcion) for row in existing}
+
+
+def import_file(file, args, model_object) -> (dict, int):
+    """Importa los elementos de un extracto bancario (CSV u OFX) al usuario logueado.
+    El archivo se procesa como stream en chunks de config.IMPORT_CHUNK_SIZE filas: cada chunk se deduplica contra
+    los elementos existentes por (fecha, monto, descripcion) y se inserta en su propia transaccion"""
+    if file is None or not file.filename:
+        return {'message': "Falta el archivo en 'file'"}, 400
+
+    created = duplicated = failed = 0
+    errors = []
+
+    def valid_rows():
+        nonlocal failed
+        for line, fields, error in rows:
+            if not error:
+                _, validation_error = validate_add(fields, model_object)
+                error = validation_error['message'] if validation_error else None
+            if error:
+                failed += 1
+                if len(errors) < cfg.IMPORT_MAX_ERRORS:
+                    errors.append({'line': line, 'message': error})
+                continue
+            yield fields
+
+    try:
+        rows = _parse_rows(file, args, model_object)
+        valid = valid_rows()
+        while chunk := list(islice(valid, cfg.IMPORT_CHUNK_SIZE)):
+            existing = _existing_keys(model_object, g.user_id, chunk)
+            nuevos = []
+            for fields in chunk:
+                key = _dedupe_key(fields['fecha'], fields['monto'], fields['descripcion'])
+                if key in existing:
+                    duplicated += 1
+                    continue
+                existing.add(key)  # Tambien se descartan las filas repetidas dentro del mismo archivo
+                nuevos.append(fields)
+            if nuevos:
+                model_object.bulk_create(g.user_id, nuevos)
+                created += len(nuevos)
+    except (ValueError, UnicodeDecodeError) as e:
+        db.session.rollback()
+        return {
+            # UnicodeDecodeError tambien es un ValueError, pero su mensaje no le sirve al usuario
+            'message': "No se pudo leer el archivo, indicar su codificacion en 'encoding'"
+                       if isinstance(e, UnicodeDecodeError) else str(e),
+            'created': created,  # Los chunks anteriores al error quedan registrados
+            'duplicated': duplicated,
+            'failed': failed,
+            'errors': errors
+        }, 400
+
+    return {
+        'message': 'Importacion finalizada',
+        'created': created,
+        'duplicated': duplicated,
+        'failed': failed,
+        'errors': errors
+    }, 201 if created else 200
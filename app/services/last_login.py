@@ -0,0 +1,73 @@
+import atexit
+import threading
+
+from flask import current_app
+from sqlalchemy import bindparam, update
+
+from app import config as cfg
+from app.db import db
+from app.models.usuarios import Usuario
+
+
+class LastLoginBuffer:
+    """Acumula en memoria el ultimo login de cada usuario y lo escribe en la base de forma diferida,
+    con un unico UPDATE por lotes cada 'interval' segundos (y al cerrar el proceso)"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._pending = {}  # {id_usuario: fecha del ultimo login}
+        self._lock = threading.Lock()
+        self._app = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def record(self, id_usuario: int, fecha):
+        """Registra un login sin esperar a la base. Varios logins del mismo usuario se combinan en uno"""
+        with self._lock:
+            self._pending[id_usuario] = fecha
+            if self._thread is None:
+                self._start()
+
+    def _start(self):
+        """Inicia el hilo que escribe periodicamente los logins pendientes"""
+        self._app = current_app._get_current_object()
+        self._thread = threading.Thread(target=self._run, name='last-login-flush', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def flush(self) -> int:
+        """Escribe los logins pendientes en un solo UPDATE por lotes. Devuelve la cantidad de usuarios actualizados"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending or self._app is None:
+            return 0
+
+        with self._app.app_context():
+            try:
+                # UPDATE de Core (sin chequeo de filas afectadas): los usuarios eliminados mientras tanto se ignoran
+                usuarios = Usuario.__table__
+                db.session.execute(
+                    update(usuarios).where(usuarios.c.id == bindparam('b_id')).values(last_login=bindparam('b_last_login')),
+                    [{'b_id': id_usuario, 'b_last_login': fecha} for id_usuario, fecha in pending.items()]
+                )
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                with self._lock:  # Se reintenta en el proximo ciclo, sin pisar logins mas recientes
+                    for id_usuario, fecha in pending.items():
+                        self._pending.setdefault(id_usuario, fecha)
+                self._app.logger.exception('No se pudo registrar el ultimo login de los usuarios')
+                return 0
+        return len(pending)
+
+    def stop(self):
+        """Detiene el hilo y escribe los logins pendientes"""
+        self._stop.set()
+        self.flush()
+
+
+last_login_buffer = LastLoginBuffer(cfg.LAST_LOGIN_FLUSH_INTERVAL)
@@ -0,0 +1,130 @@
+import base64
+import binascii
+import datetime
+import json
+
+from flask import g
+from sqlalchemy import and_, desc, literal, or_, select, union_all
+
+from app.db import db
+from app.models.gastos import Gasto
+from app.models.ingresos import Ingreso
+from app.services.cotizaciones import get_historical_rates
+from app.services.elemento_financiero import get_currency_args
+from app.utils.build_filters import build_filters
+from app.utils.exchange_rate_provider import get_rate_provider
+
+# Discriminador de cada tipo de movimiento, forma parte del orden ('gasto' < 'ingreso')
+MOVIMIENTOS = (('gasto', Gasto), ('ingreso', Ingreso))
+ORDER_CRITERIA = {"fecha_min": False, "fecha_max": True}
+
+
+def encode_movimientos_cursor(criterion: str, fecha: datetime.datetime, clase: str, id_elemento: int) -> str:
+    """Genera un cursor opaco con el criterio de orden y la clave (fecha, clase, id) del ultimo movimiento"""
+    payload = json.dumps([criterion, fecha.isoformat(), clase, id_elemento], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_movimientos_cursor(cursor: str, criterion: str) -> (datetime.datetime, str, int):
+    """Devuelve (fecha, clase, id) a partir de un cursor generado por encode_movimientos_cursor"""
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        cursor_criterion, fecha, clase, id_elemento = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        if cursor_criterion != criterion or not isinstance(id_elemento, int) or not isinstance(clase, str):
+            raise ValueError
+        fecha = datetime.datetime.fromisoformat(fecha)
+    except (ValueError, TypeError, binascii.Error):
+        raise ValueError("Parametro invalido en 'cursor'")
+    return fecha, clase, id_elemento
+
+
+def _keyset_filter(model_object, clase: str, desc_order: bool, cursor_key: tuple):
+    """Devuelve la condicion sobre una sola tabla que selecciona los movimientos posteriores al cursor.
+    Como la clase es constante dentro de cada tabla, la comparacion (fecha, clase, id) se reduce a fecha e id"""
+    fecha, cursor_clase, last_id = cursor_key
+    after = (lambda a, b: a < b) if desc_order else (lambda a, b: a > b)
+    if clase == cursor_clase:
+        return or_(after(model_object.fecha, fecha), and_(model_object.fecha == fecha, after(model_object.id, last_id)))
+    if after(clase, cursor_clase):
+        return model_object.fecha <= fecha if desc_order else model_object.fecha >= fecha
+    return after(model_object.fecha, fecha)
+
+
+def _branch(args, current_user, clase: str, model_object, desc_order: bool, cursor_key: tuple, limit: int):
+    """Devuelve la subquery de una tabla, ya filtrada, ordenada y limitada para aprovechar el indice (id_usuario, fecha, id)"""
+    filters = build_filters(args, current_user, model_object, True)
+    if cursor_key:
+        filters.append(_keyset_filter(model_object, clase, desc_order, cursor_key))
+    order = (desc(model_object.fecha), desc(model_object.id)) if desc_order else (model_object.fecha, model_object.id)
+    return select(
+        model_object.id, literal(clase).label('clase'), model_object.monto, model_object.descripcion,
+        model_object.fecha, model_object.tipo, model_object.id_usuario
+    ).where(*filters).order_by(*order).limit(limit).subquery()
+
+
+def get_movimientos(args) -> (dict, int):
+    """Devuelve un JSON con los ingresos y gastos del usuario intercalados por fecha, paginados por cursor.
+    Ambas tablas se combinan con UNION ALL en una sola query; cada rama trae a lo sumo una pagina"""
+
+    page_size = args.get('page_size', default=20, type=int)
+    if page_size <= 0:
+        return {'message': 'Los campos de paginado no admiten valores negativos o cero'}, 400
+
+    criterion = args.get('criterion') or 'fecha_max'
+    if criterion not in ORDER_CRITERIA:
+        return {"message": "Parametro invalido en 'criterion'"}, 400
+    desc_order = ORDER_CRITERIA[criterion]
+
+    try:
+        currency, currency_type, conversion = get_currency_args(args)
+        cursor = args.get('cursor')
+        cursor_key = decode_movimientos_cursor(cursor, criterion) if cursor else None
+        current_user = g.current_user
+        # Se trae un movimiento de mas para saber si existe una pagina siguiente
+        branches = [select(*branch.c) for branch in (
+            _branch(args, current_user, clase, model_object, desc_order, cursor_key, page_size + 1)
+            for clase, model_object in MOVIMIENTOS
+        )]
+    except ValueError as e:
+        return {"message": str(e)}, 400
+
+    movimientos = union_all(*branches).subquery()
+    columns = (movimientos.c.fecha, movimientos.c.clase, movimientos.c.id)
+    query = select(movimientos).order_by(*(desc(column) if desc_order else column for column in columns))
+    contents = db.session.execute(query.limit(page_size + 1)).all()
+
+    next_cursor = None
+    if len(contents) > page_size:
+        contents = contents[:page_size]
+        last = contents[-1]
+        next_cursor = encode_movimientos_cursor(criterion, last.fecha, last.clase, last.id)
+
+    # Se calcula la cotizacion de cada movimiento sin modificar los resultados de la query
+    rates = {}
+    if contents and currency != "ars".casefold():
+        try:
+            if conversion == "historica":
+                rates = get_historical_rates([content.fecha for content in contents], currency, currency_type)
+            else:
+                currency_venta = get_rate_provider().get_venta(currency, currency_type)
+                rates = {content.fecha.date(): currency_venta for content in contents}
+        except Exception as e:
+            return {"message": str(e)}, 400
+    info_cotizaciones = {"cotizacion": currency, "tipo_de_cotizacion": currency_type, "conversion": conversion}
+
+    output = []
+    for content in contents:
+        output.append({
+            'id': content.id,
+            'clase': content.clase,
+            'monto': format(content.monto / rates.get(content.fecha.date(), 1.0), ".2f"),
+            'descripcion': content.descripcion,
+            'fecha': content.fecha,
+            'tipo': content.tipo,
+            'id_usuario': content.id_usuario
+        })
+
+    return {'page_size': page_size,
+            'next_cursor': next_cursor,
+            'additional_info': info_cotizaciones,
+            'movimientos': output}, 200
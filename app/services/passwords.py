@@ -0,0 +1,70 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+from app import config as cfg
+
+
+def parse_hash_method(method: str) -> (str, tuple):
+    """Devuelve (algoritmo, parametros) de un metodo de werkzeug ("scrypt", "pbkdf2:sha256", ...) o del prefijo de un
+    hash guardado ("scrypt:32768:8:1"), completando los parametros omitidos con los valores por defecto de werkzeug"""
+    algorithm, *args = method.split(':')
+    if algorithm == 'scrypt' and not args:
+        args = [2 ** 15, 8, 1]
+    elif algorithm == 'pbkdf2':
+        args = (args or ['sha256']) + ([DEFAULT_PBKDF2_ITERATIONS] if len(args) < 2 else [])
+    return algorithm, tuple(int(arg) if str(arg).isdigit() else arg for arg in args)
+
+
+class PasswordHasherBusy(Exception):
+    """Hay demasiados hashes de password en curso o en espera; la request debe reintentarse mas tarde"""
+
+
+class PasswordHasher:
+    """Genera y verifica hashes de password en un pool acotado de hilos.
+    Los algoritmos de hashing liberan el GIL, por lo que el hilo de la request solo espera el resultado;
+    si el pool y su cola estan llenos se rechaza el trabajo en lugar de acumular requests bloqueadas"""
+
+    def __init__(self, method: str, salt_length: int, workers: int, queue_size: int, timeout: float):
+        self.method = method
+        self._parsed_method = parse_hash_method(method)
+        self.salt_length = salt_length
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy('El servidor esta ocupado, intente nuevamente en unos segundos')
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise PasswordHasherBusy('El servidor esta ocupado, intente nuevamente en unos segundos')
+
+    def hash(self, password: str) -> str:
+        """Devuelve el hash del password con el metodo y costo configurados"""
+        return self._submit(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        """Verifica el password contra el hash guardado (con los parametros con los que fue generado)"""
+        return self._submit(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Indica si el hash guardado fue generado con un metodo o costo distinto al configurado"""
+        return parse_hash_method(password_hash.split('$', 1)[0]) != self._parsed_method
+
+
+password_hasher = PasswordHasher(
+    cfg.PASSWORD_HASH_METHOD,
+    cfg.PASSWORD_SALT_LENGTH,
+    cfg.PASSWORD_HASH_WORKERS,
+    cfg.PASSWORD_HASH_QUEUE_SIZE,
+    cfg.PASSWORD_HASH_TIMEOUT
+)
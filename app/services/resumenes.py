@@ -0,0 +1,80 @@
+import datetime
+
+import click
+from sqlalchemy import and_, delete, func, insert, literal, or_, select, union_all
+
+from app.db import db
+from app.models.gastos import Gasto
+from app.models.ingresos import Ingreso
+from app.models.resumenes import Resumen
+from app.utils.date_buckets import bucket_expression, split_range
+
+
+def aggregate_range(model_object, id_usuario: int, fecha_inicio: datetime.datetime = None, fecha_fin: datetime.datetime = None) -> (float, int):
+    """Devuelve (suma, cantidad) de los elementos del usuario entre fecha_inicio y fecha_fin (inclusive).
+    Los periodos completos se leen de los resumenes y solo los bordes se calculan desde la tabla base"""
+    resumen_filters = [Resumen.id_usuario == id_usuario, Resumen.tabla == model_object.__tablename__]
+
+    if fecha_inicio is None or fecha_fin is None:  # Todo el historico: se suman todos los meses
+        periodos, bordes = [('mes', None, None)], []
+    else:
+        # fecha_fin es inclusiva: se pasa a un intervalo semiabierto
+        periodos, bordes = split_range(fecha_inicio, fecha_fin + datetime.timedelta(microseconds=1))
+
+    total_value, count_value = 0.0, 0
+    if periodos:
+        periodos_filter = or_(*[
+            and_(Resumen.granularidad == granularidad, Resumen.periodo >= primero, Resumen.periodo < ultimo)
+            if primero is not None else Resumen.granularidad == granularidad
+            for granularidad, primero, ultimo in periodos
+        ])
+        resumen_total, resumen_count = db.session.execute(
+            select(func.sum(Resumen.total), func.sum(Resumen.cantidad)).where(*resumen_filters, periodos_filter)
+        ).one()
+        total_value += resumen_total or 0.0
+        count_value += int(resumen_count or 0)
+
+    if bordes:
+        # Un rango por borde unidos con UNION ALL: con un OR de rangos el motor deja de buscar por (id_usuario, fecha)
+        # y recorre todas las filas del usuario
+        bordes_rows = union_all(*[
+            select(model_object.monto, model_object.id).where(
+                model_object.id_usuario == id_usuario, model_object.fecha >= inicio, model_object.fecha < fin)
+            for inicio, fin in bordes
+        ]).subquery()
+        bordes_total, bordes_count = db.session.execute(
+            select(func.sum(bordes_rows.c.monto), func.count(bordes_rows.c.id))
+        ).one()
+        total_value += bordes_total or 0.0
+        count_value += bordes_count or 0
+
+    return total_value, count_value
+
+
+def rebuild_resumenes():
+    """Reconstruye los resumenes semanales y mensuales de todos los usuarios a partir de las tablas de ingresos y gastos"""
+    db.session.execute(delete(Resumen))
+    for model_object in (Ingreso, Gasto):
+        for granularidad in Resumen.granularidades:
+            periodo = bucket_expression(model_object.fecha, granularidad)
+            db.session.execute(insert(Resumen).from_select(
+                ['id_usuario', 'tabla', 'granularidad', 'periodo', 'tipo', 'total', 'cantidad', 'minimo', 'maximo'],
+                select(
+                    model_object.id_usuario,
+                    literal(model_object.__tablename__),
+                    literal(granularidad),
+                    periodo,
+                    model_object.tipo,
+                    func.sum(model_object.monto),
+                    func.count(model_object.id),
+                    func.min(model_object.monto),
+                    func.max(model_object.monto)
+                ).group_by(model_object.id_usuario, periodo, model_object.tipo)
+            ))
+    db.session.commit()
+
+
+@click.command('rebuild-resumenes')  # Para reconstruir los resumenes semanales/mensuales: flask rebuild-resumenes
+def rebuild_resumenes_command():
+    rebuild_resumenes()
+    click.echo('Resumenes reconstruidos')
@@ -0,0 +1,112 @@
+import datetime
+
+import click
+from sqlalchemy import delete, func, insert, select
+
+from app.db import db
+from app.models.gastos import Gasto
+from app.models.ingresos import Ingreso
+from app.models.saldos import Saldo
+from app.models.usuarios import Usuario
+from app.services.cotizaciones import historical_rate_column
+from app.services.elemento_financiero import get_currency_args
+from app.utils.convert_to_foreign_currency import convert_to_foreign_currency
+
+
+def _sum_subquery(model_object, filters: list, rate=None):
+    """Devuelve una subquery escalar con la suma de montos (convertidos por 'rate' si se indica)"""
+    monto = model_object.monto / rate if rate is not None else model_object.monto
+    return select(func.coalesce(func.sum(monto), 0.0)).where(*filters).scalar_subquery()
+
+
+def _missing_rates_subquery(model_object, filters: list, rate):
+    """Devuelve una subquery escalar con la cantidad de elementos sin cotizacion historica"""
+    return select(func.count(model_object.id) - func.count(rate)).where(*filters).scalar_subquery()
+
+
+def get_saldo(args, id_usuario: int) -> (dict, int):
+    """Devuelve el saldo (ingresos - gastos) del usuario, opcionalmente entre fechas y en otra moneda, en una sola query"""
+
+    fecha_inicio = args.get('fecha_inicio')
+    fecha_fin = args.get('fecha_fin')
+
+    ingresos_filters = [Ingreso.id_usuario == id_usuario]
+    gastos_filters = [Gasto.id_usuario == id_usuario]
+    if fecha_inicio and fecha_fin:
+        try:
+            fecha_inicio = datetime.datetime.strptime(fecha_inicio, '%Y-%m-%d')
+            fecha_fin = datetime.datetime.strptime(fecha_fin, '%Y-%m-%d')
+        except ValueError:
+            return {
+                'message': 'Formato de fecha incorrecto'
+            }, 400
+        if fecha_fin <= fecha_inicio:
+            return {
+                'message': 'La fecha de inicio debe ser anterior a la fecha de fin'
+            }, 400
+        ingresos_filters += [Ingreso.fecha >= fecha_inicio, Ingreso.fecha <= fecha_fin]
+        gastos_filters += [Gasto.fecha >= fecha_inicio, Gasto.fecha <= fecha_fin]
+
+    try:
+        currency, currency_type, conversion = get_currency_args(args)
+    except ValueError as e:
+        return {"message": str(e)}, 400
+    info_cotizaciones = {"cotizacion": currency, "tipo_de_cotizacion": currency_type, "conversion": conversion}
+
+    if not (fecha_inicio and fecha_fin) and conversion != "historica":
+        # El saldo historico completo se lee del registro de saldos mantenido en cada alta/modificacion/baja
+        saldo_usuario = db.session.get(Saldo, id_usuario)
+        if saldo_usuario:
+            current_saldo = saldo_usuario.saldo
+            if current_saldo and currency != "ars".casefold():
+                try:
+                    current_saldo = convert_to_foreign_currency(current_saldo, currency, currency_type)
+                except Exception as e:
+                    return {"message": str(e)}, 400
+            return {'saldo': format(current_saldo, ".2f"), 'additional_info': info_cotizaciones}, 200
+
+    if conversion == "historica" and currency != "ars".casefold():
+        # Cada monto se convierte con la cotizacion de su fecha dentro de la misma query
+        ingresos_rate = historical_rate_column(Ingreso.fecha, currency, currency_type)
+        gastos_rate = historical_rate_column(Gasto.fecha, currency, currency_type)
+        current_saldo, missing_rates = db.session.execute(select(
+            _sum_subquery(Ingreso, ingresos_filters, ingresos_rate) - _sum_subquery(Gasto, gastos_filters, gastos_rate),
+            _missing_rates_subquery(Ingreso, ingresos_filters, ingresos_rate) + _missing_rates_subquery(Gasto, gastos_filters, gastos_rate)
+        )).one()
+        if missing_rates:
+            return {"message": f"No hay cotizacion historica de '{currency}' para todas las fechas pedidas"}, 400
+        return {'saldo': format(current_saldo, ".2f"), 'additional_info': info_cotizaciones}, 200
+
+    current_saldo = db.session.execute(select(
+        _sum_subquery(Ingreso, ingresos_filters) - _sum_subquery(Gasto, gastos_filters)
+    )).scalar()
+
+    if current_saldo and currency != "ars".casefold():
+        try:
+            current_saldo = convert_to_foreign_currency(current_saldo, currency, currency_type)
+        except Exception as e:
+            return {"message": str(e)}, 400
+
+    return {'saldo': format(current_saldo, ".2f"), 'additional_info': info_cotizaciones}, 200
+
+
+def rebuild_saldos():
+    """Reconstruye el registro de saldos de todos los usuarios a partir de las tablas de ingresos y gastos"""
+    ingresos = select(Ingreso.id_usuario, func.sum(Ingreso.monto).label('total')).group_by(Ingreso.id_usuario).subquery()
+    gastos = select(Gasto.id_usuario, func.sum(Gasto.monto).label('total')).group_by(Gasto.id_usuario).subquery()
+
+    db.session.execute(delete(Saldo))
+    db.session.execute(insert(Saldo).from_select(
+        ['id_usuario', 'total_ingresos', 'total_gastos'],
+        select(Usuario.id, func.coalesce(ingresos.c.total, 0.0), func.coalesce(gastos.c.total, 0.0))
+        .outerjoin(ingresos, ingresos.c.id_usuario == Usuario.id)
+        .outerjoin(gastos, gastos.c.id_usuario == Usuario.id)
+        .where(Usuario.deleted_on.is_(None))  # Las cuentas con la baja en curso ya no tienen saldo
+    ))
+    db.session.commit()
+
+
+@click.command('rebuild-saldos')  # Para reconstruir el registro de saldos: flask rebuild-saldos
+def rebuild_saldos_command():
+    rebuild_saldos()
+    click.echo('Saldos reconstruidos')
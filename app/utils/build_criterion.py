@@ -1,9 +1,9 @@
 from sqlalchemy import desc
 
 
-def build_criterion(params, filters, model_object, fetch_all=False):
-    criterion = params.get('criterion')
-    order_fields = {
+def get_order_fields(model_object) -> dict:
+    """Devuelve los criterios de orden soportados como {criterio: (campo, orden_descendente)}"""
+    return {
         "fecha_min": (model_object.fecha, False),
         "fecha_max": (model_object.fecha, True),
         "monto_min": (model_object.monto, False),
@@ -14,18 +14,37 @@ def build_criterion(params, filters, model_object, fetch_all=False):
         "last_updated_on_max": (model_object.last_updated_on, True),
     }
 
+
+def get_criterion(params, model_object):
+    """Devuelve (campo, orden_descendente) segun 'criterion', o (None, False) si no se pidio un orden"""
+    criterion = params.get('criterion')
     if not criterion:
-        query = model_object.query.filter(*filters)
+        return None, False
+
+    order_fields = get_order_fields(model_object)
+    if criterion not in order_fields:
+        raise ValueError("Parametro invalido en 'criterion'")
+    return order_fields[criterion]
+
+
+def build_query(params, filters, model_object):
+    """Arma la query filtrada y ordenada segun 'criterion', sin ejecutarla"""
+    field, desc_order = get_criterion(params, model_object)
+
+    query = model_object.query.filter(*filters)
+    # Siempre se desempata por id para que el orden sea estable entre paginas
+    if field is None:
+        query = query.order_by(model_object.id)
+    elif desc_order:
+        query = query.order_by(desc(field), desc(model_object.id))
     else:
-        if criterion in order_fields:
-            field, desc_order = order_fields[criterion]
-            query = model_object.query.filter(*filters)
-            if desc_order:
-                query = query.order_by(desc(field))
-            else:
-                query = query.order_by(field)
-        else:
-            raise ValueError("Parametro invalido en 'criterion'")
+        query = query.order_by(field, model_object.id)
+
+    return query
+
+
+def build_criterion(params, filters, model_object, fetch_all=False):
+    query = build_query(params, filters, model_object)
 
     result = query.all() if fetch_all else query.first()
-    return result
\ No newline at end of file
+    return result
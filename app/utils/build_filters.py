@@ -3,6 +3,37 @@ import datetime
 from sqlalchemy import and_
 
 
+def parse_date_range(params) -> (datetime.datetime, datetime.datetime):
+    """Devuelve (fecha_inicio, fecha_fin) parseadas, o (None, None) si no se enviaron ambas"""
+    fecha_inicio = params.get('fecha_inicio')
+    fecha_fin = params.get('fecha_fin')
+    if not (fecha_inicio and fecha_fin):
+        return None, None
+
+    try:
+        fecha_inicio = datetime.datetime.strptime(fecha_inicio, '%Y-%m-%d')
+        fecha_fin = datetime.datetime.strptime(fecha_fin, '%Y-%m-%d')
+    except ValueError:
+        raise ValueError('Formato de fecha incorrecto')
+    if fecha_fin <= fecha_inicio:
+        raise ValueError('La fecha de inicio debe ser anterior a la fecha de fin')
+    return fecha_inicio, fecha_fin
+
+
+def build_tipo_filter(model_object, tipo: str, modo: str = 'contiene'):
+    """Devuelve el filtro por tipo segun el modo de busqueda:
+    'exacto' (valor elegido de /tipos), 'prefijo' (usa el indice por usuario y tipo) o 'contiene' (recorre todas las filas del usuario)"""
+    if modo == 'exacto':
+        return model_object.tipo == tipo
+    # Se escapan los comodines para que el texto ingresado se busque literalmente
+    tipo = tipo.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    if modo == 'prefijo':
+        return model_object.tipo.like(f'{tipo}%', escape='\\')
+    if modo == 'contiene':
+        return model_object.tipo.like(f'%{tipo}%', escape='\\')
+    raise ValueError("Parametro invalido en 'tipo_busqueda'")
+
+
 def build_filters(params, current_user, model_object, ranges: bool = False) -> list:
     filters = []
 
@@ -21,17 +52,8 @@ def build_filters(params, current_user, model_object, ranges: bool = False) -> l
         except TypeError:
             raise ValueError('El monto ingresado es invalido')
 
-        fecha_inicio = params.get('fecha_inicio')
-        fecha_fin = params.get('fecha_fin')
-
+        fecha_inicio, fecha_fin = parse_date_range(params)
         if fecha_inicio and fecha_fin:
-            try:
-                fecha_inicio = datetime.datetime.strptime(fecha_inicio, '%Y-%m-%d')
-                fecha_fin = datetime.datetime.strptime(fecha_fin, '%Y-%m-%d')
-            except ValueError:
-                raise ValueError('Formato de fecha incorrecto')
-            if fecha_fin <= fecha_inicio:
-                raise ValueError('La fecha de inicio debe ser anterior a la fecha de fin')
             filters.append(and_(model_object.fecha >= fecha_inicio, model_object.fecha <= fecha_fin))
 
     else:  # El filtro es para un unico elemento
@@ -53,7 +75,7 @@ def build_filters(params, current_user, model_object, ranges: bool = False) -> l
 
     tipo = params.get('tipo')
     if tipo:
-        filters.append(model_object.tipo.like(f'%{tipo}%'))
+        filters.append(build_tipo_filter(model_object, tipo, params.get('tipo_busqueda', 'contiene')))
 
     if not current_user.is_admin:
         filters.append(model_object.id_usuario == current_user.get_id())
@@ -0,0 +1,109 @@
+import datetime
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import func
+
+from app.db import db
+
+GRANULARIDADES = ('dia', 'semana', 'mes', 'anio')
+
+
+def bucket_start(fecha, granularidad: str) -> datetime.date:
+    """Devuelve el primer dia del periodo ('semana' empieza el lunes, 'mes' y 'anio' el dia 1) que contiene a la fecha"""
+    if isinstance(fecha, datetime.datetime):
+        fecha = fecha.date()
+    if granularidad == 'dia':
+        return fecha
+    if granularidad == 'semana':
+        return fecha - datetime.timedelta(days=fecha.weekday())
+    if granularidad == 'mes':
+        return fecha.replace(day=1)
+    if granularidad == 'anio':
+        return fecha.replace(month=1, day=1)
+    raise ValueError("Parametro invalido en 'granularidad'")
+
+
+def next_bucket(periodo: datetime.date, granularidad: str) -> datetime.date:
+    """Devuelve el primer dia del periodo siguiente"""
+    if granularidad == 'dia':
+        return periodo + datetime.timedelta(days=1)
+    if granularidad == 'semana':
+        return periodo + datetime.timedelta(weeks=1)
+    if granularidad == 'mes':
+        return periodo + relativedelta(months=1)
+    if granularidad == 'anio':
+        return periodo + relativedelta(years=1)
+    raise ValueError("Parametro invalido en 'granularidad'")
+
+
+def bucket_count(inicio, fin, granularidad: str) -> int:
+    """Devuelve la cantidad de periodos entre los que contienen a inicio y a fin (ambos incluidos), sin recorrerlos"""
+    primero, ultimo = bucket_start(inicio, granularidad), bucket_start(fin, granularidad)
+    if granularidad == 'dia':
+        return (ultimo - primero).days + 1
+    if granularidad == 'semana':
+        return (ultimo - primero).days // 7 + 1
+    if granularidad == 'mes':
+        return (ultimo.year - primero.year) * 12 + ultimo.month - primero.month + 1
+    return ultimo.year - primero.year + 1
+
+
+def bucket_expression(column, granularidad: str):
+    """Devuelve la expresion SQL con el primer dia del periodo de cada fila, segun el motor de base de datos"""
+    if granularidad == 'dia':
+        return func.date(column)
+    if db.engine.dialect.name == 'sqlite':
+        if granularidad == 'semana':
+            return func.date(column, 'weekday 0', '-6 days')
+        if granularidad == 'mes':
+            return func.date(column, 'start of month')
+        if granularidad == 'anio':
+            return func.date(column, 'start of year')
+    else:
+        if granularidad == 'semana':
+            return func.subdate(func.date(column), func.weekday(column))
+        if granularidad == 'mes':
+            return func.subdate(func.date(column), func.dayofmonth(column) - 1)
+        if granularidad == 'anio':
+            return func.makedate(func.year(column), 1)
+    raise ValueError("Parametro invalido en 'granularidad'")
+
+
+def as_date(periodo) -> datetime.date:
+    """Convierte a date el periodo devuelto por bucket_expression (algunos motores lo devuelven como texto)"""
+    if isinstance(periodo, datetime.datetime):
+        return periodo.date()
+    if isinstance(periodo, datetime.date):
+        return periodo
+    return datetime.date.fromisoformat(periodo)
+
+
+def as_datetime(fecha) -> datetime.datetime:
+    """Convierte a datetime una fecha recibida como datetime, date o texto ISO"""
+    if isinstance(fecha, datetime.datetime):
+        return fecha
+    if isinstance(fecha, datetime.date):
+        return datetime.datetime.combine(fecha, datetime.time.min)
+    return datetime.datetime.fromisoformat(fecha)
+
+
+def split_range(inicio: datetime.datetime, fin: datetime.datetime, granularidades: tuple = ('mes', 'semana')) -> (list, list):
+    """Divide el intervalo [inicio, fin) en periodos completos de las granularidades dadas (de mayor a menor)
+    y en los intervalos de los bordes que no llegan a completar un periodo.
+    Devuelve ([(granularidad, primer periodo, periodo final excluido)], [(inicio, fin) de cada borde])"""
+    if inicio >= fin:
+        return [], []
+    if not granularidades:
+        return [], [(inicio, fin)]
+
+    granularidad = granularidades[0]
+    primero = bucket_start(inicio, granularidad)
+    if as_datetime(primero) < inicio:
+        primero = next_bucket(primero, granularidad)
+    ultimo = bucket_start(fin, granularidad)
+    if primero >= ultimo:  # No entra ningun periodo completo de esta granularidad
+        return split_range(inicio, fin, granularidades[1:])
+
+    periodos_izq, bordes_izq = split_range(inicio, as_datetime(primero), granularidades[1:])
+    periodos_der, bordes_der = split_range(as_datetime(ultimo), fin, granularidades[1:])
+    return [(granularidad, primero, ultimo)] + periodos_izq + periodos_der, bordes_izq + bordes_der
@@ -0,0 +1,69 @@
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app import config as cfg
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool que mide el tiempo que cada request espera para obtener una conexion"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self._depth = threading.local()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        # QueuePool._do_get se llama a si mismo al reintentar tras un overflow fallido:
+        # solo la llamada externa registra la espera, asi cada checkout se cuenta una vez
+        depth = getattr(self._depth, 'value', 0)
+        if depth:
+            return super()._do_get()
+
+        self._depth.value = 1
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._metrics_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            self._depth.value = 0
+            wait = time.perf_counter() - start
+            with self._metrics_lock:
+                self.checkouts += 1
+                self.wait_total += wait
+                self.wait_max = max(self.wait_max, wait)
+
+    def metrics(self) -> dict:
+        """Devuelve el estado actual del pool y los tiempos de espera acumulados"""
+        with self._metrics_lock:
+            return {
+                'size': self.size(),
+                'checked_out': self.checkedout(),
+                'checked_in': self.checkedin(),
+                'overflow': self.overflow(),
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_avg_ms': round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                'wait_max_ms': round(self.wait_max * 1000, 3)
+            }
+
+
+def build_engine_options() -> dict:
+    """Devuelve SQLALCHEMY_ENGINE_OPTIONS a partir de la configuracion del pool de conexiones"""
+    return {
+        'poolclass': MeteredQueuePool,
+        'pool_size': cfg.DB_POOL_SIZE,
+        'max_overflow': cfg.DB_MAX_OVERFLOW,
+        'pool_timeout': cfg.DB_POOL_TIMEOUT,
+        'pool_recycle': cfg.DB_POOL_RECYCLE,
+        'pool_pre_ping': cfg.DB_POOL_PRE_PING,
+    }
@@ -0,0 +1,136 @@
+import logging
+import threading
+import time
+
+import requests
+
+from app import config as cfg
+
+logger = logging.getLogger(__name__)
+
+DOLAR_API_URL = "https://dolarapi.com/v1"
+ARGENTINA_DATOS_API_URL = "https://api.argentinadatos.com/v1"
+
+
+class DolarApiClient:
+    """Cliente de dolarapi.com que reutiliza las conexiones HTTP entre llamadas"""
+
+    def __init__(self, base_url: str = DOLAR_API_URL, timeout: float = cfg.EXCHANGE_RATE_TIMEOUT, session: requests.Session = None):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = session if session else requests.Session()
+
+    def fetch(self, currency: str, currency_type: str) -> dict:
+        """Devuelve la cotizacion actual como {'compra': float, 'venta': float}"""
+        if currency == "usd":
+            url = f"{self.base_url}/dolares/{currency_type}"
+        else:
+            url = f"{self.base_url}/cotizaciones/{currency}"
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise Exception(f"Error en llamada a API de cotizaciones: {e}")
+        if response.status_code != 200:
+            raise Exception(f"Error en llamada a API de cotizaciones. Status_code: {response.status_code}, Reason: {response.reason}, text: {response.text}")
+        data = response.json()
+        return {'compra': data.get("compra"), 'venta': data.get("venta", 1.0)}
+
+
+class ArgentinaDatosClient:
+    """Cliente de api.argentinadatos.com, que publica el historico diario de cotizaciones del dolar"""
+
+    def __init__(self, base_url: str = ARGENTINA_DATOS_API_URL, timeout: float = cfg.EXCHANGE_RATE_HISTORY_TIMEOUT, session: requests.Session = None):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = session if session else requests.Session()
+
+    def fetch_history(self, currency_type: str) -> list:
+        """Devuelve el historico de cotizaciones como lista de {'fecha': 'AAAA-MM-DD', 'compra': float, 'venta': float}"""
+        url = f"{self.base_url}/cotizaciones/dolares/{currency_type}"
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise Exception(f"Error en llamada a API de cotizaciones historicas: {e}")
+        if response.status_code != 200:
+            raise Exception(f"Error en llamada a API de cotizaciones historicas. Status_code: {response.status_code}, Reason: {response.reason}, text: {response.text}")
+        return response.json()
+
+
+class ExchangeRateProvider:
+    """Cache en memoria de cotizaciones por (moneda, tipo de cotizacion).
+    Una cotizacion vencida hace menos de 'max_stale' segundos se sigue sirviendo mientras se refresca en segundo plano"""
+
+    def __init__(self, client=None, ttl: float = cfg.EXCHANGE_RATE_TTL, max_stale: float = cfg.EXCHANGE_RATE_MAX_STALE, clock=time.monotonic):
+        self.client = client if client else DolarApiClient()
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.clock = clock
+        self._cache = {}  # (moneda, tipo) -> (cotizacion, momento en que se obtuvo)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def get_rate(self, currency: str, currency_type: str = "oficial") -> dict:
+        """Devuelve la cotizacion {'compra', 'venta'} de la moneda, consultando la API solo si no hay una utilizable"""
+        key = (currency.casefold(), currency_type.casefold())
+        with self._lock:
+            entry = self._cache.get(key)
+
+        if entry:
+            rate, fetched_at = entry
+            age = self.clock() - fetched_at
+            if age < self.ttl:
+                return rate
+            if age < self.ttl + self.max_stale:
+                self._refresh_in_background(key)
+                return rate
+
+        return self._refresh(key)
+
+    def get_venta(self, currency: str, currency_type: str = "oficial") -> float:
+        """Devuelve el valor de venta de la moneda"""
+        return self.get_rate(currency, currency_type)['venta']
+
+    def clear(self):
+        """Descarta todas las cotizaciones cacheadas"""
+        with self._lock:
+            self._cache.clear()
+
+    def _refresh(self, key) -> dict:
+        rate = self.client.fetch(*key)
+        with self._lock:
+            self._cache[key] = (rate, self.clock())
+        return rate
+
+    def _refresh_in_background(self, key):
+        with self._lock:
+            if key in self._refreshing:  # Ya hay un refresco en curso para esta cotizacion
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self._refresh(key)
+            except Exception as e:  # Se sigue sirviendo la ultima cotizacion conocida
+                logger.warning("No se pudo refrescar la cotizacion %s: %s", key, e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+
+_provider = None
+
+
+def get_rate_provider() -> ExchangeRateProvider:
+    """Devuelve el proveedor de cotizaciones del proceso, creandolo en el primer uso"""
+    global _provider
+    if _provider is None:
+        _provider = ExchangeRateProvider()
+    return _provider
+
+
+def set_rate_provider(provider: ExchangeRateProvider):
+    """Reemplaza el proveedor de cotizaciones (por ejemplo, por uno con un cliente local en tests)"""
+    global _provider
+    _provider = provider
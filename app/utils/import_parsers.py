@@ -0,0 +1,73 @@
+import csv
+import datetime
+import io
+import re
+
+CSV_DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y %H:%M:%S')
+_OFX_TAG = re.compile(r'<(/?)([A-Z0-9.]+)>([^<\r\n]*)')
+
+
+def parse_fecha(value: str, date_format: str = None) -> datetime.datetime:
+    """Parsea una fecha con el formato dado o con alguno de los formatos habituales de los extractos bancarios"""
+    value = (value or '').strip()
+    for fmt in ((date_format,) if date_format else CSV_DATE_FORMATS):
+        try:
+            return datetime.datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError('Formato de fecha incorrecto')
+
+
+def parse_monto(value: str, decimal: str = '.') -> float:
+    """Parsea un monto con separador decimal '.' o ',' (en ese caso '.' se toma como separador de miles)"""
+    value = (value or '').strip().replace('$', '').replace(' ', '')
+    if decimal == ',':
+        value = value.replace('.', '').replace(',', '.')
+    else:
+        value = value.replace(',', '')
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError("Valor invalido en 'monto'")
+
+
+def iter_csv_rows(stream, columns: dict, delimiter: str = ',', encoding: str = 'utf-8-sig'):
+    """Genera (numero de linea, {campo: valor}) por cada fila del CSV sin cargar el archivo completo en memoria.
+    'columns' mapea cada campo del elemento ('fecha', 'monto', 'descripcion', 'tipo') a su columna en el archivo"""
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding=encoding, newline=''), delimiter=delimiter)
+    missing = [column for field, column in columns.items() if field != 'tipo' and column not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"Columnas faltantes en el archivo: {', '.join(missing)}")
+    for row in reader:
+        yield reader.line_num, {field: row.get(column) for field, column in columns.items()}
+
+
+def iter_ofx_rows(stream, encoding: str = 'latin-1'):
+    """Genera (numero de linea, {campo: valor}) por cada transaccion (<STMTTRN>) de un archivo OFX, leyendo linea a linea.
+    Soporta tanto el formato SGML (OFX 1.x, sin cierre de etiquetas) como el XML (OFX 2.x)"""
+    transaccion = None
+    for line_number, line in enumerate(io.TextIOWrapper(stream, encoding=encoding, newline=''), start=1):
+        for closing, tag, value in _OFX_TAG.findall(line):
+            if tag == 'STMTTRN':
+                if closing and transaccion is not None:
+                    yield transaccion.pop('_line'), transaccion
+                    transaccion = None
+                elif not closing:
+                    transaccion = {'_line': line_number}
+            elif transaccion is not None and not closing and value.strip():
+                transaccion[tag] = value.strip()
+
+
+def ofx_to_fields(transaccion: dict) -> dict:
+    """Mapea una transaccion OFX a los campos de un elemento. El monto conserva el signo (negativo para debitos)"""
+    fecha = transaccion.get('DTPOSTED', '')[:14]  # AAAAMMDD[HHMMSS], se descarta la zona horaria
+    try:
+        fecha = datetime.datetime.strptime(fecha, '%Y%m%d%H%M%S' if len(fecha) == 14 else '%Y%m%d')
+    except ValueError:
+        raise ValueError('Formato de fecha incorrecto')
+    return {
+        'fecha': fecha,
+        'monto': parse_monto(transaccion.get('TRNAMT', '')),
+        'descripcion': transaccion.get('MEMO') or transaccion.get('NAME') or '',
+        'tipo': transaccion.get('TRNTYPE'),
+    }
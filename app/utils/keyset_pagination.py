@@ -0,0 +1,71 @@
+import base64
+import binascii
+import datetime
+import json
+
+from sqlalchemy import DateTime, Integer, and_, or_
+
+from app.utils.build_criterion import build_query, get_criterion
+
+
+def check_cursor_field(field, criterion):
+    """Solo se pagina por cursor sobre columnas exactas: un FLOAT (como 'monto') no vuelve igual de la base y del JSON
+    del cursor, por lo que la comparacion de la pagina siguiente saltearia o repetiria elementos"""
+    if field is not None and not isinstance(field.type, (DateTime, Integer)):
+        raise ValueError(f"El criterio '{criterion}' no admite paginado por cursor, usar 'page'")
+
+
+def encode_cursor(criterion, sort_value, id_elemento: int) -> str:
+    """Genera un cursor opaco con el criterio de orden, el valor de orden y el id del ultimo elemento"""
+    if isinstance(sort_value, datetime.datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([criterion, sort_value, id_elemento], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, criterion, field):
+    """Devuelve (valor de orden, id) a partir de un cursor generado por encode_cursor"""
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        cursor_criterion, sort_value, id_elemento = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        if cursor_criterion != criterion or not isinstance(id_elemento, int):
+            raise ValueError
+        if field is not None and sort_value is not None:
+            if field.type.python_type is datetime.datetime:
+                sort_value = datetime.datetime.fromisoformat(sort_value)
+            else:
+                sort_value = field.type.python_type(sort_value)
+    except (ValueError, TypeError, binascii.Error, NotImplementedError):
+        raise ValueError("Parametro invalido en 'cursor'")
+    return sort_value, id_elemento
+
+
+def keyset_filter(field, id_field, desc_order: bool, sort_value, last_id: int):
+    """Devuelve la condicion que selecciona los elementos posteriores a (sort_value, last_id) en el orden dado"""
+    if field is None:
+        return id_field < last_id if desc_order else id_field > last_id
+    if desc_order:
+        return or_(field < sort_value, and_(field == sort_value, id_field < last_id))
+    return or_(field > sort_value, and_(field == sort_value, id_field > last_id))
+
+
+def fetch_keyset_page(params, filters, model_object, page_size: int) -> (list, str):
+    """Trae la pagina siguiente al 'cursor' recibido y devuelve el cursor de la pagina posterior (None si no hay)"""
+    criterion = params.get('criterion') or None
+    field, desc_order = get_criterion(params, model_object)
+    check_cursor_field(field, criterion)
+    query = build_query(params, filters, model_object)
+
+    cursor = params.get('cursor')
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor, criterion, field)
+        query = query.filter(keyset_filter(field, model_object.id, desc_order, sort_value, last_id))
+
+    # Se trae un elemento de mas para saber si existe una pagina siguiente
+    contents = query.limit(page_size + 1).all()
+    next_cursor = None
+    if len(contents) > page_size:
+        contents = contents[:page_size]
+        last = contents[-1]
+        next_cursor = encode_cursor(criterion, getattr(last, field.key) if field is not None else None, last.id)
+    return contents, next_cursor
@@ -1,6 +1,28 @@
 import math
 
-from flask import jsonify
+
+def build_page(page_number: int, page_size: int, total_entries: int, page_contents: list, contents_name: str = "Contents", additional_info: dict = {}) -> (dict, int):
+    """Genera la respuesta paginada a partir de los contenidos de una pagina y el total de entradas"""
+    next_page = page_number + 1 if total_entries > page_number * page_size else None
+    total_pages = math.ceil(total_entries / page_size)
+
+    return {'total_entries': total_entries,
+                    'total_pages': total_pages if total_pages > 0 else 1,
+                    'page': page_number,
+                    'page_size': page_size,
+                    'next_page': next_page,
+                    'additional_info': additional_info,
+                    contents_name: page_contents}, 200
+
+
+def fetch_page(query, page_number: int, page_size: int) -> (list, int):
+    """Trae de la base solo la pagina pedida (LIMIT/OFFSET) junto con el total de entradas (COUNT)"""
+    total_entries = query.order_by(None).count()
+    if total_entries <= (page_number - 1) * page_size:
+        return [], total_entries  # La pagina pedida esta vacia, no hace falta ir a buscarla
+
+    page_contents = query.limit(page_size).offset((page_number - 1) * page_size).all()
+    return page_contents, total_entries
 
 
 def paginated_query(page_number: int, page_size: int, contents: list, contents_name: str = "Contents", additional_info: dict = {}) -> (dict, int):
@@ -11,14 +33,6 @@ def paginated_query(page_number: int, page_size: int, contents: list, contents_n
             'message': 'Los campos de paginado no admiten valores negativos o cero'
         }, 400
     page_start = ((page_number - 1) * page_size)
-    page_end = page_start + (page_size - 1)
-    next_page = page_number + 1 if (len(contents) - 1) > page_end else None
-    total_pages = math.ceil(len(contents) / page_size)
 
-    return {'total_entries': len(contents),
-                    'total_pages': total_pages if total_pages > 0 else 1,
-                    'page': page_number,
-                    'page_size': page_size,
-                    'next_page': next_page,
-                    'additional_info': additional_info,
-                    contents_name: contents[page_start:page_end + 1]}, 200
+    return build_page(page_number, page_size, len(contents), contents[page_start:page_start + page_size],
+                      contents_name, additional_info)
@@ -0,0 +1,90 @@
+"""Logins por segundo de un worker de gunicorn: requests concurrentes a /auth/login con el password correcto.
+
+Uso: python -m benchmarks.password_hasher [--requests 64] [--threads 8] [--method scrypt:32768:8:1]
+
+Cada hilo cliente representa un hilo del worker gthread (--threads en railway.json) y hace POST /auth/login, que
+verifica el password en el pool de hashing. Se informan los logins por segundo, los percentiles de latencia y cuantos
+se rechazaron con 503 por PasswordHasherBusy. La app usa una base SQLite temporal y no se conecta a la base configurada."""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import generate_password_hash
+
+from app import config as cfg
+from app import create_app
+from app.controllers import auth
+from app.db import db, init_db
+from app.models.usuarios import Usuario
+from app.services.passwords import PasswordHasher
+
+_PASSWORD = 'password de prueba'
+
+
+def _percentil(valores: list, p: float) -> float:
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(round(p / 100 * (len(valores) - 1))))]
+
+
+def run(requests: int, threads: int, method: str, workers: int, queue_size: int) -> dict:
+    with tempfile.TemporaryDirectory() as directorio:
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(directorio, 'benchmark.db')}",
+            'SQLALCHEMY_ENGINE_OPTIONS': {},
+        })
+        with app.app_context():
+            init_db()
+            # Hash generado con el mismo metodo que verifica el login, asi no se regenera durante la medicion
+            usuario = Usuario('benchmark', generate_password_hash(_PASSWORD, method, cfg.PASSWORD_SALT_LENGTH),
+                              'benchmark@mail.com', is_verified=True)
+            Usuario.create(usuario)
+
+        hasher_original = auth.password_hasher
+        auth.password_hasher = PasswordHasher(method, cfg.PASSWORD_SALT_LENGTH, workers, queue_size,
+                                              cfg.PASSWORD_HASH_TIMEOUT)
+        try:
+            def login(_):
+                start = time.perf_counter()
+                response = app.test_client().post('/auth/login', json={'username': 'benchmark', 'password': _PASSWORD})
+                if response.status_code == 503:
+                    return None
+                assert response.status_code == 200, response.get_json()
+                return time.perf_counter() - start
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as clientes:
+                resultados = list(clientes.map(login, range(requests)))
+            total = time.perf_counter() - start
+        finally:
+            auth.password_hasher = hasher_original
+            auth.last_login_buffer.flush()  # Antes de borrar la base temporal
+            with app.app_context():
+                db.engine.dispose()
+
+    latencias = [resultado * 1000 for resultado in resultados if resultado is not None]
+    return {
+        'method': method,
+        'workers': workers,
+        'queue_size': queue_size,
+        'threads': threads,
+        'atendidas': len(latencias),
+        'rechazadas': len(resultados) - len(latencias),
+        'logins_por_segundo': round(len(latencias) / total, 1),
+        'p50_ms': round(statistics.median(latencias), 1) if latencias else None,
+        'p95_ms': round(_percentil(latencias, 95), 1) if latencias else None,
+        'max_ms': round(max(latencias), 1) if latencias else None,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=64)
+    parser.add_argument('--threads', type=int, default=cfg.DB_POOL_SIZE)
+    parser.add_argument('--method', default=cfg.PASSWORD_HASH_METHOD)
+    parser.add_argument('--workers', type=int, default=cfg.PASSWORD_HASH_WORKERS)
+    parser.add_argument('--queue-size', type=int, default=cfg.PASSWORD_HASH_QUEUE_SIZE)
+    args = parser.parse_args()
+    print(run(args.requests, args.threads, args.method, args.workers, args.queue_size))
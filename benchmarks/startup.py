@@ -0,0 +1,45 @@
+"""Tiempo de inicio de la app: importar el paquete, crear la app con create_app() y atender la primera request.
+
+Uso: python -m benchmarks.startup [--runs 10]
+
+Cada medicion se hace en un proceso nuevo, como al iniciar un worker de gunicorn. La app se crea con una base
+SQLite en memoria: create_app() no se conecta a la base, por lo que el resultado no depende de la red."""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+_MEDICION = '''
+import json, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'SQLALCHEMY_ENGINE_OPTIONS': {}})
+created = time.perf_counter()
+app.test_client().get('/health')
+served = time.perf_counter()
+print(json.dumps([imported - start, created - imported, served - created]))
+'''
+
+
+def run(runs: int) -> dict:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root)
+    mediciones = [
+        json.loads(subprocess.run([sys.executable, '-c', _MEDICION], cwd=root, env=env,
+                                  capture_output=True, text=True, check=True).stdout)
+        for _ in range(runs)
+    ]
+    etapas = ('import_ms', 'create_app_ms', 'primera_request_ms')
+    resultado = {etapa: round(statistics.median(m[i] for m in mediciones) * 1000, 1) for i, etapa in enumerate(etapas)}
+    resultado['total_ms'] = round(statistics.median(sum(m) for m in mediciones) * 1000, 1)
+    resultado['runs'] = runs
+    return resultado
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    print(run(parser.parse_args().runs))
@@ -0,0 +1,47 @@
+"""Costo de validar el access token en cada request: jwt.decode contra un acierto en la cache de tokens.
+
+Uso: python -m benchmarks.token_cache [--iterations 100000]
+
+Se mide decode_access_token() (el que usa token_required) con el token ya cacheado y jwt.decode() con la misma
+clave y algoritmo. La app se crea con una base SQLite en memoria y no se conecta a la base configurada."""
+import argparse
+import datetime
+import time
+
+import jwt
+
+from app import create_app, decode_access_token
+
+
+def _por_llamada_us(funcion, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        funcion()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def run(iterations: int) -> dict:
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'SQLALCHEMY_ENGINE_OPTIONS': {}})
+    secret_key = app.config['SECRET_KEY']
+    token = jwt.encode({
+        'id': 1,
+        'exp': datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(minutes=15)
+    }, secret_key, algorithm='HS256')
+
+    with app.app_context():
+        decode_access_token(token)  # La primera validacion guarda el payload en la cache
+        jwt_decode_us = _por_llamada_us(lambda: jwt.decode(token, secret_key, algorithms=['HS256']), iterations)
+        cache_hit_us = _por_llamada_us(lambda: decode_access_token(token), iterations)
+
+    return {
+        'iterations': iterations,
+        'jwt_decode_us': round(jwt_decode_us, 2),
+        'cache_hit_us': round(cache_hit_us, 2),
+        'speedup': round(jwt_decode_us / cache_hit_us, 1),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=100_000)
+    print(run(parser.parse_args().iterations))
@@ -0,0 +1,90 @@
+"""tablas iniciales: usuarios, gastos, ingresos y feedback
+
+Revision ID: 3e46c8d2d7ca
+Revises: 
+Create Date: 2026-10-18 09:45:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e46c8d2d7ca'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Las bases creadas por db.create_all() en versiones anteriores de la app ya tienen estas tablas: se adoptan como estan
+    existentes = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'usuarios' not in existentes:
+        _create_usuarios()
+    for table in ('gastos', 'ingresos'):
+        if table not in existentes:
+            _create_elementos(table)
+    if 'feedback' not in existentes:
+        _create_feedback()
+
+
+def _create_usuarios():
+    op.create_table('usuarios',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=30), nullable=False),
+    sa.Column('password_hash', sa.String(length=256), nullable=False),
+    sa.Column('email', sa.String(length=50), nullable=False),
+    sa.Column('created_on', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('last_updated_on', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('last_login', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('imagen', sa.String(length=1024), nullable=True),
+    sa.Column('is_admin', sa.Boolean(), nullable=False),
+    sa.Column('is_verified', sa.Boolean(), nullable=False),
+    sa.Column('is_money_visible', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_usuarios_created_on'), ['created_on'], unique=False)
+        batch_op.create_index(batch_op.f('ix_usuarios_last_login'), ['last_login'], unique=False)
+        batch_op.create_index(batch_op.f('ix_usuarios_last_updated_on'), ['last_updated_on'], unique=False)
+        batch_op.create_index(batch_op.f('ix_usuarios_username'), ['username'], unique=True)
+
+
+def _create_elementos(table):
+    op.create_table(table,
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('descripcion', sa.String(length=256), nullable=False),
+    sa.Column('fecha', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('created_on', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('last_updated_on', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('monto', sa.Float(), nullable=False),
+    sa.Column('tipo', sa.String(length=32), nullable=False),
+    sa.Column('id_usuario', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['id_usuario'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table(table, schema=None) as batch_op:
+        batch_op.create_index(batch_op.f(f'ix_{table}_created_on'), ['created_on'], unique=False)
+        batch_op.create_index(batch_op.f(f'ix_{table}_fecha'), ['fecha'], unique=False)
+        batch_op.create_index(batch_op.f(f'ix_{table}_last_updated_on'), ['last_updated_on'], unique=False)
+
+
+def _create_feedback():
+    op.create_table('feedback',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('descripcion', sa.String(length=256), nullable=False),
+    sa.Column('created_on', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('tipo', sa.String(length=32), nullable=False),
+    sa.Column('id_usuario', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['id_usuario'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('feedback', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_feedback_created_on'), ['created_on'], unique=False)
+
+
+def downgrade():
+    op.drop_table('feedback')
+    op.drop_table('ingresos')
+    op.drop_table('gastos')
+    op.drop_table('usuarios')
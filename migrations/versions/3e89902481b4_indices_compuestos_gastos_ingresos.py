@@ -0,0 +1,40 @@
+"""indices compuestos por usuario en gastos e ingresos
+
+Revision ID: 3e89902481b4
+Revises: c3446a805cac
+Create Date: 2026-10-18 11:40:15.902245
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e89902481b4'
+down_revision = 'c3446a805cac'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for table in ('gastos', 'ingresos'):
+        # Las bases creadas por db.create_all() en versiones anteriores de la app ya pueden tener los indices
+        existentes = {index['name'] for index in inspector.get_indexes(table)}
+        indices = {
+            f'ix_{table}_id_usuario_fecha_id': ['id_usuario', 'fecha', 'id'],
+            f'ix_{table}_id_usuario_monto': ['id_usuario', 'monto'],
+            f'ix_{table}_id_usuario_tipo': ['id_usuario', 'tipo'],
+        }
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for name, columns in indices.items():
+                if name not in existentes:
+                    batch_op.create_index(name, columns, unique=False)
+
+
+def downgrade():
+    for table in ('gastos', 'ingresos'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(f'ix_{table}_id_usuario_tipo')
+            batch_op.drop_index(f'ix_{table}_id_usuario_monto')
+            batch_op.drop_index(f'ix_{table}_id_usuario_fecha_id')
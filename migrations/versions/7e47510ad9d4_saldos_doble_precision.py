@@ -0,0 +1,48 @@
+"""saldos: totales en doble precision
+
+Revision ID: 7e47510ad9d4
+Revises: df98a0a9c809
+Create Date: 2026-10-18 16:05:12.412087
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e47510ad9d4'
+down_revision = 'df98a0a9c809'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # En MySQL sa.Float crea un FLOAT de 4 bytes: los totales mayores a 2^24 pierden los pesos impares y los centavos
+    with op.batch_alter_table('saldos', schema=None) as batch_op:
+        batch_op.alter_column('total_ingresos', existing_type=sa.Float(), type_=sa.Double(), existing_nullable=False)
+        batch_op.alter_column('total_gastos', existing_type=sa.Float(), type_=sa.Double(), existing_nullable=False)
+    _recalcular_saldos()
+
+
+def _recalcular_saldos():
+    """Recalcula desde las tablas base los totales ya redondeados por la columna anterior"""
+    saldos = sa.table('saldos', sa.column('id_usuario'), sa.column('total_ingresos'), sa.column('total_gastos'))
+    usuarios = sa.table('usuarios', sa.column('id'))
+    totales = {}
+    for tabla in ('ingresos', 'gastos'):
+        elementos = sa.table(tabla, sa.column('id_usuario'), sa.column('monto'))
+        totales[tabla] = sa.select(elementos.c.id_usuario, sa.func.sum(elementos.c.monto).label('total')) \
+            .group_by(elementos.c.id_usuario).subquery()
+    op.execute(saldos.delete())
+    op.execute(saldos.insert().from_select(
+        ['id_usuario', 'total_ingresos', 'total_gastos'],
+        sa.select(usuarios.c.id, sa.func.coalesce(totales['ingresos'].c.total, 0.0), sa.func.coalesce(totales['gastos'].c.total, 0.0))
+        .outerjoin(totales['ingresos'], totales['ingresos'].c.id_usuario == usuarios.c.id)
+        .outerjoin(totales['gastos'], totales['gastos'].c.id_usuario == usuarios.c.id)
+    ))
+
+
+def downgrade():
+    with op.batch_alter_table('saldos', schema=None) as batch_op:
+        batch_op.alter_column('total_gastos', existing_type=sa.Double(), type_=sa.Float(), existing_nullable=False)
+        batch_op.alter_column('total_ingresos', existing_type=sa.Double(), type_=sa.Float(), existing_nullable=False)
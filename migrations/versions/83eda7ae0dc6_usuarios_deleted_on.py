@@ -0,0 +1,29 @@
+"""usuarios: fecha de inicio de la baja de la cuenta
+
+Revision ID: 83eda7ae0dc6
+Revises: eccf33f0eca3
+Create Date: 2026-10-18 16:48:03.551920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '83eda7ae0dc6'
+down_revision = 'eccf33f0eca3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # La columna ya existe si la base la creo db.create_all() con el modelo actual
+    if 'deleted_on' in {column['name'] for column in sa.inspect(op.get_bind()).get_columns('usuarios')}:
+        return
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_on', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.drop_column('deleted_on')
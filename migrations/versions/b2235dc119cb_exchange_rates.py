@@ -0,0 +1,35 @@
+"""exchange_rates: historico diario de cotizaciones
+
+Revision ID: b2235dc119cb
+Revises: 3e46c8d2d7ca
+Create Date: 2026-10-18 10:12:04.118311
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2235dc119cb'
+down_revision = '3e46c8d2d7ca'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Las bases creadas por db.create_all() en versiones anteriores de la app ya pueden tener la tabla
+    if not sa.inspect(op.get_bind()).has_table('exchange_rates'):
+        op.create_table('exchange_rates',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.Column('currency', sa.String(length=8), nullable=False),
+        sa.Column('currency_type', sa.String(length=32), nullable=False),
+        sa.Column('compra', sa.Float(), nullable=True),
+        sa.Column('venta', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('currency', 'currency_type', 'fecha', name='uq_exchange_rates_currency_type_fecha')
+        )
+
+
+def downgrade():
+    op.drop_table('exchange_rates')
@@ -0,0 +1,53 @@
+"""saldos: totales de ingresos y gastos por usuario
+
+Revision ID: c3446a805cac
+Revises: b2235dc119cb
+Create Date: 2026-10-18 11:02:47.530912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3446a805cac'
+down_revision = 'b2235dc119cb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Las bases creadas por db.create_all() en versiones anteriores de la app ya pueden tener la tabla
+    if not sa.inspect(op.get_bind()).has_table('saldos'):
+        op.create_table('saldos',
+        sa.Column('id_usuario', sa.Integer(), nullable=False),
+        sa.Column('total_ingresos', sa.Double(), nullable=False),
+        sa.Column('total_gastos', sa.Double(), nullable=False),
+        sa.Column('last_updated_on', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.ForeignKeyConstraint(['id_usuario'], ['usuarios.id'], ),
+        sa.PrimaryKeyConstraint('id_usuario')
+        )
+    _cargar_saldos()
+
+
+def _cargar_saldos():
+    """Calcula el saldo de los usuarios con ingresos o gastos existentes: sin su fila, el primer movimiento
+    nuevo crearia un saldo que solo incluye ese movimiento (equivale a "flask rebuild-saldos")"""
+    saldos = sa.table('saldos', sa.column('id_usuario'), sa.column('total_ingresos'), sa.column('total_gastos'))
+    usuarios = sa.table('usuarios', sa.column('id'))
+    totales = {}
+    for tabla in ('ingresos', 'gastos'):
+        elementos = sa.table(tabla, sa.column('id_usuario'), sa.column('monto'))
+        totales[tabla] = sa.select(elementos.c.id_usuario, sa.func.sum(elementos.c.monto).label('total')) \
+            .group_by(elementos.c.id_usuario).subquery()
+    op.execute(saldos.delete())
+    op.execute(saldos.insert().from_select(
+        ['id_usuario', 'total_ingresos', 'total_gastos'],
+        sa.select(usuarios.c.id, sa.func.coalesce(totales['ingresos'].c.total, 0.0), sa.func.coalesce(totales['gastos'].c.total, 0.0))
+        .outerjoin(totales['ingresos'], totales['ingresos'].c.id_usuario == usuarios.c.id)
+        .outerjoin(totales['gastos'], totales['gastos'].c.id_usuario == usuarios.c.id)
+    ))
+
+
+def downgrade():
+    op.drop_table('saldos')
@@ -0,0 +1,75 @@
+"""resumenes: totales semanales y mensuales por usuario y tipo
+
+Revision ID: df98a0a9c809
+Revises: 3e89902481b4
+Create Date: 2026-10-18 12:31:09.664170
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'df98a0a9c809'
+down_revision = '3e89902481b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Las bases creadas por db.create_all() en versiones anteriores de la app ya pueden tener la tabla
+    if not sa.inspect(op.get_bind()).has_table('resumenes'):
+        op.create_table('resumenes',
+        sa.Column('id_usuario', sa.Integer(), nullable=False),
+        sa.Column('tabla', sa.String(length=16), nullable=False),
+        sa.Column('granularidad', sa.String(length=8), nullable=False),
+        sa.Column('periodo', sa.Date(), nullable=False),
+        sa.Column('tipo', sa.String(length=32), nullable=False),
+        sa.Column('total', sa.Double(), nullable=False),
+        sa.Column('cantidad', sa.Integer(), nullable=False),
+        sa.Column('minimo', sa.Double(), nullable=False),
+        sa.Column('maximo', sa.Double(), nullable=False),
+        sa.ForeignKeyConstraint(['id_usuario'], ['usuarios.id'], ),
+        sa.PrimaryKeyConstraint('id_usuario', 'tabla', 'granularidad', 'periodo', 'tipo')
+        )
+    _cargar_resumenes()
+
+
+def _periodo(fecha, granularidad: str, dialect: str):
+    """Primer dia de la semana (lunes) o del mes de cada fila, igual que app.utils.date_buckets.bucket_expression"""
+    if dialect == 'sqlite':
+        return sa.func.date(fecha, 'weekday 0', '-6 days') if granularidad == 'semana' else sa.func.date(fecha, 'start of month')
+    if granularidad == 'semana':
+        return sa.func.subdate(sa.func.date(fecha), sa.func.weekday(fecha))
+    return sa.func.subdate(sa.func.date(fecha), sa.func.dayofmonth(fecha) - 1)
+
+
+def _cargar_resumenes():
+    """Calcula los resumenes de los ingresos y gastos existentes, para que los totales no arranquen en cero
+    (equivale a "flask rebuild-resumenes")"""
+    bind = op.get_bind()
+    resumenes = sa.table('resumenes', *(sa.column(name) for name in (
+        'id_usuario', 'tabla', 'granularidad', 'periodo', 'tipo', 'total', 'cantidad', 'minimo', 'maximo')))
+    op.execute(resumenes.delete())
+    for tabla in ('ingresos', 'gastos'):
+        elementos = sa.table(tabla, *(sa.column(name) for name in ('id', 'id_usuario', 'fecha', 'monto', 'tipo')))
+        for granularidad in ('semana', 'mes'):
+            periodo = _periodo(elementos.c.fecha, granularidad, bind.dialect.name)
+            op.execute(resumenes.insert().from_select(
+                [column.name for column in resumenes.columns],
+                sa.select(
+                    elementos.c.id_usuario,
+                    sa.literal(tabla),
+                    sa.literal(granularidad),
+                    periodo,
+                    elementos.c.tipo,
+                    sa.func.sum(elementos.c.monto),
+                    sa.func.count(elementos.c.id),
+                    sa.func.min(elementos.c.monto),
+                    sa.func.max(elementos.c.monto)
+                ).group_by(elementos.c.id_usuario, periodo, elementos.c.tipo)
+            ))
+
+
+def downgrade():
+    op.drop_table('resumenes')
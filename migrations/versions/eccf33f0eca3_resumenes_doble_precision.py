@@ -0,0 +1,66 @@
+"""resumenes: totales, minimos y maximos en doble precision
+
+Revision ID: eccf33f0eca3
+Revises: 7e47510ad9d4
+Create Date: 2026-10-18 16:21:40.087315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'eccf33f0eca3'
+down_revision = '7e47510ad9d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # En MySQL sa.Float crea un FLOAT de 4 bytes: un total mensual de 2.345.678,91 se guardaba como 2.345.679
+    with op.batch_alter_table('resumenes', schema=None) as batch_op:
+        for column in ('total', 'minimo', 'maximo'):
+            batch_op.alter_column(column, existing_type=sa.Float(), type_=sa.Double(), existing_nullable=False)
+    _recalcular_resumenes()
+
+
+def _periodo(fecha, granularidad: str, dialect: str):
+    """Primer dia de la semana (lunes) o del mes de cada fila, igual que app.utils.date_buckets.bucket_expression"""
+    if dialect == 'sqlite':
+        return sa.func.date(fecha, 'weekday 0', '-6 days') if granularidad == 'semana' else sa.func.date(fecha, 'start of month')
+    if granularidad == 'semana':
+        return sa.func.subdate(sa.func.date(fecha), sa.func.weekday(fecha))
+    return sa.func.subdate(sa.func.date(fecha), sa.func.dayofmonth(fecha) - 1)
+
+
+def _recalcular_resumenes():
+    """Recalcula desde las tablas base los resumenes ya redondeados por las columnas anteriores
+    (equivale a "flask rebuild-resumenes")"""
+    bind = op.get_bind()
+    resumenes = sa.table('resumenes', *(sa.column(name) for name in (
+        'id_usuario', 'tabla', 'granularidad', 'periodo', 'tipo', 'total', 'cantidad', 'minimo', 'maximo')))
+    op.execute(resumenes.delete())
+    for tabla in ('ingresos', 'gastos'):
+        elementos = sa.table(tabla, *(sa.column(name) for name in ('id', 'id_usuario', 'fecha', 'monto', 'tipo')))
+        for granularidad in ('semana', 'mes'):
+            periodo = _periodo(elementos.c.fecha, granularidad, bind.dialect.name)
+            op.execute(resumenes.insert().from_select(
+                [column.name for column in resumenes.columns],
+                sa.select(
+                    elementos.c.id_usuario,
+                    sa.literal(tabla),
+                    sa.literal(granularidad),
+                    periodo,
+                    elementos.c.tipo,
+                    sa.func.sum(elementos.c.monto),
+                    sa.func.count(elementos.c.id),
+                    sa.func.min(elementos.c.monto),
+                    sa.func.max(elementos.c.monto)
+                ).group_by(elementos.c.id_usuario, periodo, elementos.c.tipo)
+            ))
+
+
+def downgrade():
+    with op.batch_alter_table('resumenes', schema=None) as batch_op:
+        for column in ('maximo', 'minimo', 'total'):
+            batch_op.alter_column(column, existing_type=sa.Double(), type_=sa.Float(), existing_nullable=False)
@@ -0,0 +1,44 @@
+import pytest
+
+from app import create_app
+from app.controllers.auth import generate_access_token
+from app.db import db, init_db
+from app.models import usuarios
+from app.models.usuarios import Usuario
+
+
+@pytest.fixture
+def empty_app(tmp_path):
+    """App con una base SQLite vacia propia por test (nunca se conecta a la base configurada en db_config)"""
+    usuarios._autenticados.clear()  # Los ids se repiten entre bases de distintos tests
+    return create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'SQLALCHEMY_ENGINE_OPTIONS': {},
+    })
+
+
+@pytest.fixture
+def app(empty_app):
+    """App con el esquema de la ultima migracion y un contexto de aplicacion activo"""
+    app = empty_app
+    with app.app_context():
+        init_db()  # El esquema lo crean las migraciones, igual que en produccion
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    """Crea un usuario y devuelve (id, headers con su access token)"""
+    def _make_user(username: str, is_admin: bool = False):
+        usuario = Usuario(username, 'hash', f'{username}@mail.com', is_admin=is_admin)
+        Usuario.create(usuario)
+        return usuario.id, {'x-access-token': generate_access_token(usuario.get_id())}
+    return _make_user
@@ -0,0 +1,60 @@
+import datetime
+import time
+
+from app.db import db
+from app.models.gastos import Gasto
+from app.models.resumenes import Resumen
+from app.models.saldos import Saldo
+from app.models.usuarios import Usuario
+from app.services.cuentas import resume_account_deletions, start_account_deletion
+
+
+def test_al_iniciar_la_baja_la_cuenta_deja_de_operar(client, make_user):
+    id_usuario, headers = make_user('duenio')
+    Gasto.create(Gasto(id_usuario, 'super', 100.0, 'comida', datetime.datetime(2024, 1, 10)))
+    assert client.get('/usuarios/whoami', headers=headers).status_code == 200  # Queda en la cache de autenticados
+
+    assert start_account_deletion(id_usuario)
+
+    assert client.get('/usuarios/whoami', headers=headers).status_code == 401
+    assert client.post('/auth/login', json={'username': 'duenio', 'password': 'hash'}).status_code == 401
+    # Los totales derivados se eliminan en la misma transaccion que marca la cuenta
+    assert db.session.query(Saldo).filter_by(id_usuario=id_usuario).count() == 0
+    assert db.session.query(Resumen).filter_by(id_usuario=id_usuario).count() == 0
+    assert client.get('/usuarios/delete_status', headers=headers).get_json() == {'estado': 'en_proceso'}
+
+
+def test_el_borrado_interrumpido_se_retoma(client, make_user, monkeypatch):
+    monkeypatch.setattr('app.config.ACCOUNT_DELETE_CHUNK_SIZE', 2)
+    id_usuario, headers = make_user('duenio')
+    id_otro, _ = make_user('otro')
+    for id_ in (id_usuario, id_otro):
+        for monto in (10.0, 20.0, 30.0):
+            Gasto.create(Gasto(id_, 'gasto', monto, 'comida', datetime.datetime(2024, 1, 10)))
+    start_account_deletion(id_usuario)  # El proceso se reinicia antes de borrar por partes
+
+    assert start_account_deletion(id_usuario)  # Volver a iniciarla no cambia nada
+    assert resume_account_deletions() == 1
+    assert resume_account_deletions() == 0
+
+    assert db.session.get(Usuario, id_usuario) is None
+    assert db.session.query(Gasto).filter_by(id_usuario=id_usuario).count() == 0
+    assert db.session.query(Gasto).filter_by(id_usuario=id_otro).count() == 3
+    assert client.get('/usuarios/delete_status', headers=headers).get_json() == {'estado': 'eliminada'}
+
+
+def test_el_cliente_consulta_el_estado_del_borrado_en_segundo_plano(client, make_user):
+    id_usuario, headers = make_user('duenio')
+    Gasto.create(Gasto(id_usuario, 'super', 100.0, 'comida', datetime.datetime(2024, 1, 10)))
+    assert client.get('/usuarios/delete_status', headers=headers).get_json() == {'estado': 'activa'}
+
+    response = client.delete('/usuarios/delete?async=true', headers=headers)
+    assert response.status_code == 202
+    assert response.headers['Location'].endswith('/usuarios/delete_status')
+    assert client.get('/usuarios/whoami', headers=headers).status_code == 401
+
+    deadline = time.monotonic() + 5
+    while client.get('/usuarios/delete_status', headers=headers).get_json()['estado'] != 'eliminada':
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    assert db.session.query(Gasto).filter_by(id_usuario=id_usuario).count() == 0
@@ -0,0 +1,50 @@
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app import config as cfg
+from app.utils.db_pool import MeteredQueuePool
+
+
+def test_un_checkout_con_reintentos_internos_se_cuenta_una_vez(monkeypatch):
+    original = QueuePool._do_get
+    llamadas = []
+
+    def do_get_con_reintento(self):
+        llamadas.append(1)
+        if len(llamadas) == 1:  # Igual que QueuePool al fallar un overflow: se vuelve a llamar a si mismo
+            return self._do_get()
+        return original(self)
+
+    monkeypatch.setattr(QueuePool, '_do_get', do_get_con_reintento)
+    pool = MeteredQueuePool(lambda: sqlite3.connect(':memory:'), pool_size=1, max_overflow=0)
+
+    connection = pool.connect()
+    connection.close()
+
+    assert len(llamadas) == 2
+    assert pool.metrics()['checkouts'] == 1
+
+
+def test_metricas_de_checkouts_y_timeouts():
+    pool = MeteredQueuePool(lambda: sqlite3.connect(':memory:'), pool_size=1, max_overflow=0, timeout=0.01)
+
+    connection = pool.connect()
+    with pytest.raises(PoolTimeoutError):
+        pool.connect()
+    connection.close()
+
+    metrics = pool.metrics()
+    assert metrics['checkouts'] == 2
+    assert metrics['timeouts'] == 1
+
+
+def test_el_pool_tiene_una_conexion_por_hilo_de_gunicorn():
+    with open(Path(__file__).parents[1] / 'railway.json') as f:
+        start_command = json.load(f)['deploy']['startCommand'].split()
+    assert start_command[start_command.index('--worker-class') + 1] == 'gthread'
+    assert int(start_command[start_command.index('--threads') + 1]) == cfg.DB_POOL_SIZE
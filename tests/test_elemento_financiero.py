@@ -0,0 +1,88 @@
+import datetime
+
+from app.db import db
+from app.models.gastos import Gasto
+
+
+def _gasto(id_usuario: int) -> int:
+    gasto = Gasto(id_usuario, 'super', 100.0, 'comida', datetime.datetime(2024, 1, 10))
+    Gasto.create(gasto)
+    return gasto.id
+
+
+def test_update_y_delete_de_un_elemento_ajeno_devuelven_404(client, make_user):
+    duenio, _ = make_user('duenio')
+    _, headers_otro = make_user('otro')
+    id_gasto = _gasto(duenio)
+
+    response = client.put('/gastos/update', headers=headers_otro,
+                          json={'id': id_gasto, 'descripcion': 'x', 'monto': 1, 'tipo': 'x'})
+    assert response.status_code == 404
+    response = client.delete(f'/gastos/delete?id={id_gasto}', headers=headers_otro)
+    assert response.status_code == 404
+    assert db.session.get(Gasto, id_gasto).monto == 100.0
+
+
+def test_update_y_delete_del_propio_elemento(client, make_user):
+    duenio, headers = make_user('duenio')
+    id_gasto = _gasto(duenio)
+
+    response = client.put('/gastos/update', headers=headers,
+                          json={'id': id_gasto, 'descripcion': 'x', 'monto': 50, 'tipo': 'otros'})
+    assert response.status_code == 200
+    response = client.delete(f'/gastos/delete?id={id_gasto}', headers=headers)
+    assert response.status_code == 200
+    assert db.session.get(Gasto, id_gasto) is None
+
+
+def test_admin_puede_modificar_elementos_ajenos(client, make_user):
+    duenio, _ = make_user('duenio')
+    _, headers_admin = make_user('admin', is_admin=True)
+    id_gasto = _gasto(duenio)
+
+    response = client.delete(f'/gastos/delete?id={id_gasto}', headers=headers_admin)
+    assert response.status_code == 200
+
+
+def test_bulk_add_all_or_nothing_no_informa_como_creados_a_los_validos(client, make_user):
+    _, headers = make_user('duenio')
+    items = [
+        {'descripcion': 'a', 'monto': 10, 'tipo': 'comida', 'fecha': '2024-01-10'},
+        {'descripcion': 'b', 'monto': -5, 'tipo': 'comida', 'fecha': '2024-01-11'},
+    ]
+
+    response = client.post('/gastos/bulk_add', headers=headers, json={'items': items, 'all_or_nothing': True})
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body['created'] == 0
+    assert [result['status'] for result in body['results']] == [409, 400]
+    assert Gasto.query.count() == 0
+
+
+def test_bulk_add_parcial_registra_los_validos(client, make_user):
+    _, headers = make_user('duenio')
+    items = [
+        {'descripcion': 'a', 'monto': 10, 'tipo': 'comida', 'fecha': '2024-01-10'},
+        {'descripcion': 'b', 'monto': -5, 'tipo': 'comida', 'fecha': '2024-01-11'},
+    ]
+
+    response = client.post('/gastos/bulk_add', headers=headers, json={'items': items})
+    assert response.status_code == 207
+    assert [result['status'] for result in response.get_json()['results']] == [201, 400]
+    assert Gasto.query.count() == 1
+
+
+def test_series_limita_la_cantidad_de_periodos(client, make_user, monkeypatch):
+    monkeypatch.setattr('app.config.SERIES_MAX_BUCKETS', 12)
+    id_usuario, headers = make_user('duenio')
+    _gasto(id_usuario)
+
+    response = client.get('/gastos/series?granularidad=mes&fecha_inicio=2024-01-01&fecha_fin=2024-12-31', headers=headers)
+    assert response.status_code == 200
+    assert len(response.get_json()['series']) == 12
+    assert response.get_json()['series'][0] == {'periodo': '2024-01-01', 'total': '100.00', 'count': 1, 'average': '100.00'}
+
+    response = client.get('/gastos/series?granularidad=mes&fecha_inicio=2024-01-01&fecha_fin=2025-01-01', headers=headers)
+    assert response.status_code == 400
+    response = client.get('/gastos/series?granularidad=dia&fecha_inicio=0001-01-01&fecha_fin=9999-12-31', headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,16 @@
+def test_health_solo_indica_que_el_proceso_responde(client):
+    response = client.get('/health')
+    assert response.status_code == 200
+    assert response.get_json() == {'health': 'ok'}
+
+
+def test_metricas_requieren_un_administrador(client, make_user):
+    _, headers = make_user('usuario')
+    _, headers_admin = make_user('admin', is_admin=True)
+
+    assert client.get('/health/metrics').status_code == 401
+    assert client.get('/health/metrics', headers=headers).status_code == 403
+
+    response = client.get('/health/metrics', headers=headers_admin)
+    assert response.status_code == 200
+    assert set(response.get_json()) == {'token_cache', 'db_pool'}
@@ -0,0 +1,112 @@
+import datetime
+import io
+import os
+
+import pytest
+
+from app.utils.import_parsers import iter_csv_rows, iter_ofx_rows, ofx_to_fields, parse_fecha, parse_monto
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+COLUMNS = {'fecha': 'fecha', 'monto': 'monto', 'descripcion': 'descripcion', 'tipo': 'tipo'}
+
+
+def _fixture(name: str):
+    return open(os.path.join(FIXTURES, name), 'rb')
+
+
+def test_csv_utf8_con_bom():
+    with _fixture('extracto.csv') as stream:
+        rows = list(iter_csv_rows(stream, COLUMNS))
+
+    # El BOM no queda pegado al nombre de la primera columna y los acentos se decodifican
+    assert rows[0] == (2, {'fecha': '2024-01-10', 'monto': '1500.50', 'descripcion': 'Supermercado Día', 'tipo': 'comida'})
+    assert rows[1] == (3, {'fecha': '10/01/2024', 'monto': '1,200.00', 'descripcion': 'Farmacia', 'tipo': ''})
+    assert len(rows) == 7
+
+
+def test_csv_con_columnas_delimitador_y_encoding_propios():
+    columns = {'fecha': 'Fecha', 'monto': 'Importe', 'descripcion': 'Concepto', 'tipo': 'Rubro'}
+    with _fixture('extracto_latin1.csv') as stream:
+        rows = list(iter_csv_rows(stream, columns, delimiter=';', encoding='latin-1'))
+
+    # La columna 'tipo' es opcional
+    assert rows == [
+        (2, {'fecha': '10/01/2024', 'monto': '1.500,50', 'descripcion': 'Panadería', 'tipo': None}),
+        (3, {'fecha': '11/01/2024', 'monto': '20,00', 'descripcion': 'Kiosco', 'tipo': None}),
+    ]
+    assert parse_monto(rows[0][1]['monto'], decimal=',') == 1500.5
+
+
+def test_csv_latin1_leido_como_utf8_falla():
+    with _fixture('extracto_latin1.csv') as stream:
+        with pytest.raises(UnicodeDecodeError):
+            list(iter_csv_rows(stream, {'fecha': 'Fecha', 'monto': 'Importe', 'descripcion': 'Concepto'}, delimiter=';'))
+
+
+def test_csv_sin_columnas_obligatorias():
+    with pytest.raises(ValueError, match='Columnas faltantes en el archivo: monto'):
+        list(iter_csv_rows(io.BytesIO(b'fecha,descripcion\n2024-01-10,x\n'), COLUMNS))
+    with pytest.raises(ValueError, match='Columnas faltantes'):
+        list(iter_csv_rows(io.BytesIO(b''), COLUMNS))
+
+
+def test_csv_fila_con_menos_columnas():
+    rows = list(iter_csv_rows(io.BytesIO(b'fecha,monto,descripcion\n2024-01-10,100\n'), COLUMNS))
+    assert rows == [(2, {'fecha': '2024-01-10', 'monto': '100', 'descripcion': None, 'tipo': None})]
+
+
+def test_ofx_sgml():
+    with _fixture('extracto.ofx') as stream:
+        rows = list(iter_ofx_rows(stream))
+
+    assert [line for line, _ in rows] == [15, 22, 29, 36]
+    assert rows[0][1] == {'TRNTYPE': 'DEBIT', 'DTPOSTED': '20240110120000[-3:ART]', 'TRNAMT': '-1500.50',
+                          'FITID': '1', 'MEMO': 'Compra supermercado'}
+    assert rows[3][1]['MEMO'] == 'Panadería'  # CHARSET 1252 / latin-1
+
+
+def test_ofx_xml():
+    with _fixture('extracto_v2.ofx') as stream:
+        transacciones = [transaccion for _, transaccion in iter_ofx_rows(stream)]
+
+    assert [ofx_to_fields(transaccion) for transaccion in transacciones] == [
+        {'fecha': datetime.datetime(2024, 1, 15), 'monto': -45.1, 'descripcion': 'Subte', 'tipo': 'DEBIT'},
+        {'fecha': datetime.datetime(2024, 1, 16), 'monto': 1000.0, 'descripcion': 'Transferencia', 'tipo': 'CREDIT'},
+    ]
+
+
+def test_ofx_to_fields_conserva_el_signo_y_valida_la_fecha():
+    with _fixture('extracto.ofx') as stream:
+        transacciones = [transaccion for _, transaccion in iter_ofx_rows(stream)]
+
+    debito = ofx_to_fields(transacciones[0])
+    assert debito['fecha'] == datetime.datetime(2024, 1, 10, 12, 0, 0)  # Sin la zona horaria
+    assert debito['monto'] == -1500.5
+    credito = ofx_to_fields(transacciones[1])
+    assert (credito['monto'], credito['descripcion']) == (250000.0, 'Sueldo')  # Sin MEMO se usa NAME
+    with pytest.raises(ValueError, match='Formato de fecha incorrecto'):
+        ofx_to_fields(transacciones[2])
+
+
+@pytest.mark.parametrize('value, decimal, expected', [
+    ('1500.50', '.', 1500.5),
+    ('1,200.00', '.', 1200.0),
+    ('$ 1.200,50', ',', 1200.5),
+    ('-30', '.', -30.0),
+])
+def test_parse_monto(value, decimal, expected):
+    assert parse_monto(value, decimal) == expected
+
+
+@pytest.mark.parametrize('value', ['abc', '', None])
+def test_parse_monto_invalido(value):
+    with pytest.raises(ValueError, match="Valor invalido en 'monto'"):
+        parse_monto(value)
+
+
+def test_parse_fecha():
+    assert parse_fecha('2024-01-10') == datetime.datetime(2024, 1, 10)
+    assert parse_fecha('10/01/2024 08:30:00') == datetime.datetime(2024, 1, 10, 8, 30)
+    assert parse_fecha('01-10-2024', '%m-%d-%Y') == datetime.datetime(2024, 1, 10)
+    with pytest.raises(ValueError, match='Formato de fecha incorrecto'):
+        parse_fecha('2024-13-01')
@@ -0,0 +1,110 @@
+import io
+import os
+
+from app import config as cfg
+from app.models.gastos import Gasto
+from app.models.ingresos import Ingreso
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def _importar(client, headers, url: str, nombre: str, contenido: bytes = None, **params):
+    if contenido is None:
+        with open(os.path.join(FIXTURES, nombre), 'rb') as fixture:
+            contenido = fixture.read()
+    response = client.post(url, headers=headers, query_string=params, content_type='multipart/form-data',
+                           data={'file': (io.BytesIO(contenido), nombre)})
+    return response.status_code, response.get_json()
+
+
+def test_csv_con_filas_invalidas_y_repetidas(client, make_user):
+    _, headers = make_user('duenio')
+
+    status, body = _importar(client, headers, '/gastos/import', 'extracto.csv')
+
+    assert status == 201
+    assert (body['created'], body['duplicated'], body['failed']) == (3, 1, 3)
+    assert body['errors'] == [
+        {'line': 4, 'message': 'Formato de fecha incorrecto'},
+        {'line': 5, 'message': "Valor invalido en 'monto'"},
+        {'line': 6, 'message': 'monto negativo'},
+    ]
+    gastos = {gasto.descripcion: gasto for gasto in Gasto.query.all()}
+    assert gastos['Farmacia'].monto == 1200.0 and gastos['Farmacia'].tipo == 'Importado'
+    assert gastos['Supermercado Día'].monto == 1500.5
+
+
+def test_reimportar_el_mismo_archivo_no_duplica(client, make_user):
+    _, headers = make_user('duenio')
+    _importar(client, headers, '/gastos/import', 'extracto.csv')
+
+    status, body = _importar(client, headers, '/gastos/import', 'extracto.csv')
+
+    assert status == 200
+    assert (body['created'], body['duplicated']) == (0, 4)
+    assert Gasto.query.count() == 3
+
+
+def test_csv_con_opciones_de_formato_y_encoding(client, make_user):
+    _, headers = make_user('duenio')
+    opciones = {'delimiter': ';', 'decimal': ',', 'col_fecha': 'Fecha', 'col_monto': 'Importe', 'col_descripcion': 'Concepto'}
+
+    status, body = _importar(client, headers, '/gastos/import', 'extracto_latin1.csv', **opciones)
+    assert status == 400
+    assert body['message'] == "No se pudo leer el archivo, indicar su codificacion en 'encoding'"
+
+    status, body = _importar(client, headers, '/gastos/import', 'extracto_latin1.csv', encoding='utf-16-le-x', **opciones)
+    assert (status, body['message']) == (400, "Parametro invalido en 'encoding'")
+
+    status, body = _importar(client, headers, '/gastos/import', 'extracto_latin1.csv', encoding='latin-1', **opciones)
+    assert (status, body['created']) == (201, 2)
+    assert sorted((gasto.monto, gasto.descripcion) for gasto in Gasto.query.all()) == [(20.0, 'Kiosco'), (1500.5, 'Panadería')]
+
+
+def test_ofx_separa_debitos_y_creditos_por_signo(client, make_user):
+    _, headers = make_user('duenio')
+
+    status, body = _importar(client, headers, '/gastos/import', 'extracto.ofx')
+    assert (status, body['created'], body['failed']) == (201, 2, 1)
+    assert body['errors'] == [{'line': 29, 'message': 'Formato de fecha incorrecto'}]
+    assert sorted((gasto.monto, gasto.tipo) for gasto in Gasto.query.all()) == [(320.0, 'POS'), (1500.5, 'DEBIT')]
+
+    status, body = _importar(client, headers, '/ingresos/import', 'extracto.ofx', tipo='sueldo')
+    assert (status, body['created']) == (201, 1)
+    ingreso = Ingreso.query.one()
+    assert (ingreso.monto, ingreso.descripcion, ingreso.tipo) == (250000.0, 'Sueldo', 'sueldo')
+
+
+def _csv(filas: list) -> bytes:
+    return ('fecha,monto,descripcion\n' + ''.join(f'{fecha},{monto},{descripcion}\n' for fecha, monto, descripcion in filas)).encode()
+
+
+def test_deduplicacion_entre_chunks(client, make_user, monkeypatch):
+    monkeypatch.setattr(cfg, 'IMPORT_CHUNK_SIZE', 2)
+    _, headers = make_user('duenio')
+    filas = [
+        ('2024-01-10', 10, 'a'),
+        ('2024-01-10', 20, 'b'),
+        ('2024-01-10', 20.001, 'b'),  # Primer elemento del segundo chunk, repetido del chunk anterior (a centavos)
+        ('2024-01-11', 30, 'c'),
+        ('2024-01-11', 30, 'c'),  # Repetido dentro del mismo chunk
+    ]
+
+    status, body = _importar(client, headers, '/gastos/import', 'chunks.csv', _csv(filas))
+
+    assert (status, body['created'], body['duplicated']) == (201, 3, 2)
+    assert Gasto.query.count() == 3
+
+
+def test_error_de_lectura_conserva_los_chunks_anteriores(client, make_user, monkeypatch):
+    monkeypatch.setattr(cfg, 'IMPORT_CHUNK_SIZE', 100)
+    _, headers = make_user('duenio')
+    # Mas filas que las que entran en el buffer de lectura, para que el error aparezca despues del primer chunk
+    filas = [('2024-01-10', i + 1, f'gasto {i}') for i in range(1000)]
+    contenido = _csv(filas) + '2024-01-12,30,Panadería\n'.encode('latin-1')
+
+    status, body = _importar(client, headers, '/gastos/import', 'chunks.csv', contenido)
+
+    assert status == 400
+    assert body['created'] > 0 and body['created'] % 100 == 0
+    assert Gasto.query.count() == body['created']
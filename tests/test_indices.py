@@ -0,0 +1,103 @@
+import datetime
+
+import pytest
+from sqlalchemy import event
+from werkzeug.datastructures import MultiDict
+
+from app.db import db
+from app.models.gastos import Gasto
+from app.models.ingresos import Ingreso
+from app.models.usuarios import UsuarioAutenticado
+from app.services.resumenes import aggregate_range
+from app.utils.build_criterion import build_query
+from app.utils.build_filters import build_filters
+from app.utils.keyset_pagination import keyset_filter
+
+USUARIO = UsuarioAutenticado(1, False, False, True)
+
+
+def _query_plan(query) -> str:
+    """Devuelve el plan de SQLite (EXPLAIN QUERY PLAN) de la query del listado"""
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    params = tuple(str(compiled.params[name]) for name in compiled.positiontup)
+    with db.engine.connect() as connection:
+        rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', params).all()
+    return '\n'.join(row[-1] for row in rows)
+
+
+def _planes_ejecutados(tabla: str, funcion) -> list:
+    """Ejecuta la funcion y devuelve el plan de SQLite de cada query que ejecuto sobre la tabla"""
+    ejecutadas = []
+
+    def capturar(conn, cursor, statement, parameters, context, executemany):
+        if f'FROM {tabla}' in statement:
+            ejecutadas.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capturar)
+    try:
+        funcion()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capturar)
+    with db.engine.connect() as connection:
+        return ['\n'.join(row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all())
+                for statement, parameters in ejecutadas]
+
+
+def _listado(model_object, **params):
+    params = MultiDict(params)
+    return build_query(params, build_filters(params, USUARIO, model_object, True), model_object)
+
+
+@pytest.mark.parametrize('model_object', [Gasto, Ingreso])
+def test_listado_por_rango_de_fechas_usa_el_indice_compuesto(app, model_object):
+    tabla = model_object.__tablename__
+    query = _listado(model_object, fecha_inicio='2024-01-01', fecha_fin='2024-02-01', criterion='fecha_max')
+
+    plan = _query_plan(query)
+    # Busqueda por (id_usuario, fecha) y orden por (fecha, id) desde el indice, sin ordenar en memoria
+    assert f'USING INDEX ix_{tabla}_id_usuario_fecha_id (id_usuario=? AND fecha>? AND fecha<?)' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+@pytest.mark.parametrize('model_object', [Gasto, Ingreso])
+def test_pagina_siguiente_por_cursor_usa_el_indice_compuesto(app, model_object):
+    tabla = model_object.__tablename__
+    query = _listado(model_object, criterion='fecha_max')
+    query = query.filter(keyset_filter(model_object.fecha, model_object.id, True, datetime.datetime(2024, 1, 10), 50))
+
+    plan = _query_plan(query)
+    assert f'ix_{tabla}_id_usuario_fecha_id (id_usuario=?' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+def test_busqueda_de_tipo_por_prefijo_usa_el_indice_por_tipo(app):
+    plan = _query_plan(_listado(Gasto, tipo='com', tipo_busqueda='prefijo'))
+    assert 'ix_gastos_id_usuario_tipo (id_usuario=?' in plan
+
+
+def test_bordes_del_rango_agregado_usan_el_indice_por_fecha(make_user):
+    id_usuario, _ = make_user('duenio')
+    # Del 3/1 al 20/3: los meses y semanas completos salen de los resumenes y quedan cuatro bordes en la tabla base
+    [plan] = _planes_ejecutados('gastos', lambda: aggregate_range(
+        Gasto, id_usuario, datetime.datetime(2024, 1, 3), datetime.datetime(2024, 3, 20)))
+
+    assert plan.count('SEARCH gastos USING INDEX ix_gastos_id_usuario_fecha_id (id_usuario=? AND fecha>? AND fecha<?)') == 4
+    assert 'SCAN gastos' not in plan
+
+
+def test_series_agrupa_los_periodos_buscando_por_fecha(client, make_user):
+    _, headers = make_user('duenio')
+    [plan] = _planes_ejecutados('gastos', lambda: client.get(
+        '/gastos/series?granularidad=mes&fecha_inicio=2024-01-01&fecha_fin=2024-12-31', headers=headers))
+
+    # El periodo es una expresion sobre la fecha: se agrupa en memoria, pero solo las filas del rango
+    assert 'SEARCH gastos USING INDEX ix_gastos_id_usuario_fecha_id (id_usuario=? AND fecha>? AND fecha<?)' in plan
+
+
+def test_por_tipo_agrupa_desde_el_indice_por_tipo(client, make_user):
+    _, headers = make_user('duenio')
+    [plan] = _planes_ejecutados('gastos', lambda: client.get('/gastos/por_tipo', headers=headers))
+
+    # Los tipos se leen en orden desde (id_usuario, tipo): solo se ordena el resultado agrupado por total
+    assert 'SEARCH gastos USING INDEX ix_gastos_id_usuario_tipo (id_usuario=?)' in plan
+    assert 'TEMP B-TREE FOR GROUP BY' not in plan
@@ -0,0 +1,37 @@
+import datetime
+
+from app.models.gastos import Gasto
+
+
+def _get_all(client, headers, **params):
+    response = client.get('/gastos/get_all', headers=headers, query_string=params)
+    return response.status_code, response.get_json()
+
+
+def test_paginado_por_cursor_recorre_todos_los_elementos_una_vez(client, make_user):
+    id_usuario, headers = make_user('duenio')
+    fecha = datetime.datetime(2024, 1, 10)
+    for i in range(7):  # Fechas repetidas: el desempate por id tiene que mantener el orden entre paginas
+        Gasto.create(Gasto(id_usuario, f'gasto {i}', 10.1 + i, 'comida', fecha + datetime.timedelta(days=i // 3)))
+
+    ids = []
+    cursor = ''
+    while cursor is not None:
+        status, body = _get_all(client, headers, criterion='fecha_max', page_size=2, cursor=cursor)
+        assert status == 200
+        ids += [gasto['id'] for gasto in body['gastos']]
+        cursor = body['next_cursor']
+
+    assert sorted(ids) == list(range(1, 8))
+    assert len(ids) == len(set(ids))
+
+
+def test_paginado_por_cursor_rechaza_criterios_de_monto(client, make_user):
+    _, headers = make_user('duenio')
+
+    status, body = _get_all(client, headers, criterion='monto_min', cursor='')
+    assert status == 400
+    assert 'monto_min' in body['message']
+
+    status, _ = _get_all(client, headers, criterion='monto_min', page=1)
+    assert status == 200
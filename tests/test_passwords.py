@@ -0,0 +1,49 @@
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app.services.passwords import PasswordHasher, PasswordHasherBusy, parse_hash_method
+
+
+def _hasher(method: str, workers: int = 1, queue_size: int = 2) -> PasswordHasher:
+    return PasswordHasher(method, 16, workers, queue_size, timeout=5)
+
+
+@pytest.mark.parametrize('method, expected', [
+    ('scrypt', ('scrypt', (32768, 8, 1))),
+    ('scrypt:32768:8:1', ('scrypt', (32768, 8, 1))),
+    ('pbkdf2', ('pbkdf2', ('sha256', 600000))),
+    ('pbkdf2:sha256', ('pbkdf2', ('sha256', 600000))),
+    ('pbkdf2:sha512:1000', ('pbkdf2', ('sha512', 1000))),
+])
+def test_parse_hash_method_completa_los_valores_por_defecto(method, expected):
+    assert parse_hash_method(method) == expected
+
+
+def test_metodo_abreviado_no_regenera_hashes_con_los_mismos_parametros():
+    # "scrypt" se guarda como "scrypt:32768:8:1": no debe pedir rehash en cada login
+    assert not _hasher('scrypt').needs_rehash(generate_password_hash('clave', 'scrypt'))
+    assert not _hasher('scrypt:32768:8:1').needs_rehash(generate_password_hash('clave', 'scrypt'))
+    assert not _hasher('pbkdf2').needs_rehash(generate_password_hash('clave', 'pbkdf2:sha256:600000'))
+
+
+def test_otro_metodo_o_costo_regenera_el_hash():
+    hasher = _hasher('scrypt:32768:8:1')
+    assert hasher.needs_rehash(generate_password_hash('clave', 'scrypt:16384:8:1'))
+    assert hasher.needs_rehash(generate_password_hash('clave', 'pbkdf2:sha256:1000'))
+
+
+def test_hash_y_verify():
+    hasher = _hasher('pbkdf2:sha256:1000')
+    password_hash = hasher.hash('clave')
+    assert password_hash.startswith('pbkdf2:sha256:1000$')
+    assert hasher.verify(password_hash, 'clave')
+    assert not hasher.verify(password_hash, 'otra')
+
+
+def test_pool_lleno_rechaza_el_trabajo():
+    hasher = _hasher('pbkdf2:sha256:1000', workers=1, queue_size=0)
+    hasher._slots.acquire()  # Ocupa el unico lugar disponible
+    with pytest.raises(PasswordHasherBusy):
+        hasher.hash('clave')
+    hasher._slots.release()
+    assert hasher.hash('clave')
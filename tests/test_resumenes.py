@@ -0,0 +1,58 @@
+import datetime
+
+import pytest
+import sqlalchemy as sa
+from flask_migrate import upgrade
+from sqlalchemy.dialects import mysql
+from sqlalchemy.schema import CreateTable
+
+from app.db import db
+from app.models.gastos import Gasto
+from app.models.resumenes import Resumen
+from app.services.resumenes import aggregate_range
+
+
+def _total_directo(id_usuario: int, inicio=None, fin=None) -> (float, int):
+    filters = [Gasto.id_usuario == id_usuario]
+    if inicio is not None:
+        filters += [Gasto.fecha >= inicio, Gasto.fecha <= fin]
+    total, cantidad = db.session.execute(sa.select(sa.func.sum(Gasto.monto), sa.func.count(Gasto.id)).where(*filters)).one()
+    return total or 0.0, cantidad
+
+
+def test_la_migracion_carga_los_resumenes_de_los_datos_existentes(empty_app):
+    with empty_app.app_context():
+        upgrade(revision='3e89902481b4')  # Base con datos, anterior a la tabla de resumenes
+        db.session.execute(sa.text(
+            "INSERT INTO usuarios (id, username, password_hash, email, is_admin, is_verified, is_money_visible) "
+            "VALUES (1, 'duenio', 'hash', 'duenio@mail.com', 0, 0, 1)"
+        ))
+        inicio = datetime.datetime(2024, 1, 1, 12)
+        for dia in range(0, 120, 3):
+            db.session.execute(sa.insert(Gasto.__table__).values(
+                id_usuario=1, descripcion='gasto', monto=10.5 + dia, tipo='comida' if dia % 2 else 'servicios',
+                fecha=inicio + datetime.timedelta(days=dia)
+            ))
+        db.session.commit()
+
+        upgrade()
+
+        assert db.session.query(Resumen).count() > 0
+        assert aggregate_range(Gasto, 1) == pytest.approx(_total_directo(1))
+        desde, hasta = datetime.datetime(2024, 1, 17), datetime.datetime(2024, 3, 20, 23, 59)
+        assert aggregate_range(Gasto, 1, desde, hasta) == pytest.approx(_total_directo(1, desde, hasta))
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_resumenes_en_doble_precision_en_mysql():
+    # SQLite siempre guarda REAL de 8 bytes; en MySQL sa.Float seria un FLOAT de 4 bytes (redondea sobre 2^24)
+    ddl = str(CreateTable(Resumen.__table__).compile(dialect=mysql.dialect()))
+    for column in ('total', 'minimo', 'maximo'):
+        assert f'{column} DOUBLE NOT NULL' in ddl
+
+
+def test_el_recalculo_lee_con_bloqueo():
+    # En MySQL (REPEATABLE READ) una lectura sin bloqueo no ve los elementos commiteados por otras transacciones
+    query = Resumen.totales_periodo(Gasto, 1, 'comida', 'mes', datetime.date(2024, 1, 1))
+    assert str(query.compile(dialect=mysql.dialect())).endswith('FOR UPDATE')
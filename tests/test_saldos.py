@@ -0,0 +1,62 @@
+import datetime
+
+import sqlalchemy as sa
+from flask_migrate import upgrade
+from sqlalchemy.dialects import mysql
+from sqlalchemy.schema import CreateTable
+
+from app.db import db
+from app.models.gastos import Gasto
+from app.models.ingresos import Ingreso
+from app.models.saldos import Saldo
+
+
+def test_saldo_acumula_altas_cambios_y_bajas(make_user):
+    id_usuario, _ = make_user('duenio')
+    fecha = datetime.datetime(2024, 1, 10)
+
+    Ingreso.create(Ingreso(id_usuario, 'sueldo', 1000.0, 'sueldo', fecha))
+    gasto = Gasto(id_usuario, 'super', 100.0, 'comida', fecha)
+    Gasto.create(gasto)
+    Gasto.create(Gasto(id_usuario, 'luz', 50.0, 'servicios', fecha))
+    gasto.monto = 80.0
+    gasto.update()
+
+    saldo = db.session.get(Saldo, id_usuario)
+    db.session.refresh(saldo)
+    assert (saldo.total_ingresos, saldo.total_gastos) == (1000.0, 130.0)
+
+    gasto.delete()
+    db.session.refresh(saldo)
+    assert saldo.total_gastos == 50.0
+    assert db.session.query(Saldo).count() == 1
+
+
+def test_la_migracion_carga_los_saldos_de_los_datos_existentes(empty_app):
+    with empty_app.app_context():
+        upgrade(revision='b2235dc119cb')  # Base con datos, anterior a la tabla de saldos
+        db.session.execute(sa.text(
+            "INSERT INTO usuarios (id, username, password_hash, email, is_admin, is_verified, is_money_visible) "
+            "VALUES (1, 'duenio', 'hash', 'duenio@mail.com', 0, 0, 1), (2, 'nuevo', 'hash', 'nuevo@mail.com', 0, 0, 1)"
+        ))
+        fecha = datetime.datetime(2024, 1, 10)
+        for monto in (100.0, 50.0):
+            db.session.execute(sa.insert(Gasto.__table__).values(
+                id_usuario=1, descripcion='gasto', monto=monto, tipo='comida', fecha=fecha))
+        db.session.commit()
+
+        upgrade()
+        Ingreso.create(Ingreso(1, 'sueldo', 1000.0, 'sueldo', fecha))
+
+        saldo = db.session.get(Saldo, 1)
+        assert (saldo.total_ingresos, saldo.total_gastos) == (1000.0, 150.0)
+        assert db.session.get(Saldo, 2).saldo == 0.0
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_totales_en_doble_precision_en_mysql():
+    # SQLite siempre guarda REAL de 8 bytes; en MySQL sa.Float seria un FLOAT de 4 bytes (redondea sobre 2^24)
+    ddl = str(CreateTable(Saldo.__table__).compile(dialect=mysql.dialect()))
+    assert 'total_ingresos DOUBLE NOT NULL' in ddl
+    assert 'total_gastos DOUBLE NOT NULL' in ddl
@@ -0,0 +1,23 @@
+import time
+
+import jwt
+import pytest
+
+import app as app_module
+from app import decode_access_token
+
+
+def test_un_token_cacheado_se_rechaza_justo_al_vencer(empty_app, monkeypatch):
+    with empty_app.app_context():
+        exp = int(time.time()) + 60
+        token = jwt.encode({'id': 1, 'exp': exp}, empty_app.config['SECRET_KEY'], algorithm='HS256')
+        assert decode_access_token(token)['id'] == 1  # Verificado con jwt.decode y guardado en la cache
+
+        hits = app_module._tokens.hits
+        monkeypatch.setattr(time, 'time', lambda: exp - 0.001)
+        assert decode_access_token(token)['id'] == 1
+        assert app_module._tokens.hits == hits + 1  # Se resolvio desde la cache, sin jwt.decode
+
+        monkeypatch.setattr(time, 'time', lambda: exp)
+        with pytest.raises(jwt.ExpiredSignatureError):  # Igual que jwt.decode: vence cuando exp == ahora
+            decode_access_token(token)